@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+class WorkforceConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'workforce'
+
+    def ready(self):
+        # Register signal handlers
+        from . import signals
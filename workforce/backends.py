@@ -0,0 +1,58 @@
+import importlib
+import os
+import threading
+
+# Solver and numerics backends, imported on first use so that WSGI workers and
+# manage.py commands that never solve anything do not pay for them.
+BACKENDS = {
+    'pulp': 'pulp',
+    'numpy': 'numpy',
+}
+
+_loaded = {}
+_lock = threading.Lock()
+
+def register_backend(name, module_path):
+    """
+    Register a backend module under a name without importing it.
+    """
+    with _lock:
+        BACKENDS[name] = module_path
+        _loaded.pop(name, None)
+
+def get_backend(name):
+    """
+    Return the module registered under name, importing it on first use.
+    """
+    module = _loaded.get(name)
+    if module is None:
+        with _lock:
+            module = _loaded.get(name)
+            if module is None:
+                module = importlib.import_module(BACKENDS[name])
+                _loaded[name] = module
+    return module
+
+def loaded_backends():
+    return sorted(_loaded)
+
+def prewarm(names=None):
+    """
+    Import backends ahead of the first request, e.g. from a worker's post-fork hook.
+    Defaults to settings.SOLVER_PREWARM. Prewarming PuLP also runs its solver discovery.
+    """
+    if names is None:
+        from django.conf import settings
+        names = getattr(settings, 'SOLVER_PREWARM', [])
+    for name in names:
+        module = get_backend(name)
+        if name == 'pulp':
+            module.PULP_CBC_CMD(msg=False).available()
+    return loaded_backends()
+
+def post_fork(server, worker):
+    """
+    Gunicorn hook: add `from workforce.backends import post_fork` to gunicorn.conf.py.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'workforce.settings')
+    prewarm()
@@ -0,0 +1,98 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+# Cached objects are invalidated precisely by the handlers in signals.py, and
+# explicitly after bulk writes and assignment deletes, which those handlers do not
+# see. The timeout is a backstop. Settings use a shared file cache when several
+# worker processes run; a per-process LocMemCache cannot see other processes'
+# invalidations, so it gets a short timeout. The cache only feeds rendered pages;
+# solvers always read production lines from the database.
+PRODUCTION_LINES_KEY = 'workforce:production_lines'
+ROSTER_VERSION_KEY = 'workforce:roster_version'
+ROSTER_TEMPLATE = 'workforce/shift_roster.html'
+
+def cache_timeout():
+    return getattr(settings, 'WORKFORCE_CACHE_TIMEOUT', 3600)
+
+def get_production_lines():
+    """
+    All production lines in priority order, served from the cache when possible.
+    For display only; solvers must query the database.
+    """
+    from .models import ProductionLine
+
+    lines = cache.get(PRODUCTION_LINES_KEY)
+    if lines is None:
+        lines = list(ProductionLine.objects.all().order_by('-priority', 'id'))
+        cache.set(PRODUCTION_LINES_KEY, lines, cache_timeout())
+    return lines
+
+def invalidate_production_lines():
+    cache.delete(PRODUCTION_LINES_KEY)
+
+def _roster_version():
+    version = cache.get(ROSTER_VERSION_KEY)
+    if version is None:
+        version = 1
+        cache.add(ROSTER_VERSION_KEY, version, None)
+    return version
+
+def roster_key(shift_id, version):
+    return f'workforce:roster:{version}:{shift_id}'
+
+def invalidate_shift_rosters(shift_ids):
+    """
+    Drop the cached roster fragments of the given shifts.
+    """
+    version = _roster_version()
+    cache.delete_many([roster_key(shift_id, version) for shift_id in set(shift_ids)])
+
+def invalidate_all_rosters():
+    """
+    Retire every cached roster fragment at once, e.g. after a worker is renamed.
+    """
+    try:
+        cache.incr(ROSTER_VERSION_KEY)
+    except ValueError:
+        cache.set(ROSTER_VERSION_KEY, 2, None)
+
+def render_shift_rosters(shifts):
+    """
+    Rendered roster fragment per shift, in order. Cached fragments are fetched in
+    one round trip; the rest are rendered from two bulk queries and cached.
+    """
+    from .models import ShiftAssignment, LineAssignment
+
+    version = _roster_version()
+    keys = {shift.id: roster_key(shift.id, version) for shift in shifts}
+    fragments = cache.get_many(list(keys.values()))
+
+    missing = [shift for shift in shifts if keys[shift.id] not in fragments]
+    if missing:
+        missing_ids = [shift.id for shift in missing]
+        assignments = {}
+        for assignment in ShiftAssignment.objects.filter(
+            shift_id__in=missing_ids
+        ).select_related('worker').order_by('worker__name'):
+            assignments.setdefault(assignment.shift_id, []).append(assignment)
+        line_assignments = {}
+        for line_assignment in LineAssignment.objects.filter(
+            shift_assignment__shift_id__in=missing_ids
+        ).select_related('production_line', 'shift_assignment__worker').order_by(
+            '-production_line__priority', 'production_line__name', 'shift_assignment__worker__name'
+        ):
+            line_assignments.setdefault(line_assignment.shift_assignment.shift_id, []).append(line_assignment)
+
+        rendered = {}
+        for shift in missing:
+            rendered[keys[shift.id]] = render_to_string(ROSTER_TEMPLATE, {
+                'shift': shift,
+                'assignments': assignments.get(shift.id, []),
+                'line_assignments': line_assignments.get(shift.id, []),
+            })
+        cache.set_many(rendered, cache_timeout())
+        fragments.update(rendered)
+
+    return [(shift, mark_safe(fragments[keys[shift.id]])) for shift in shifts]
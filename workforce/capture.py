@@ -0,0 +1,104 @@
+import json
+import logging
+import os
+import random
+import time
+import uuid
+from django.conf import settings
+from .backends import get_backend
+from .optimization import PARAMETER_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Capture format version, stored in every file's metadata
+CAPTURE_VERSION = 1
+
+def capture_enabled():
+    """
+    Captures are opt-in: set settings.SOLVE_CAPTURE_DIR (or the SOLVE_CAPTURE_DIR
+    environment variable). settings.SOLVE_CAPTURE_SAMPLE_RATE keeps a random share.
+    """
+    if not getattr(settings, 'SOLVE_CAPTURE_DIR', None):
+        return False
+    return random.random() < getattr(settings, 'SOLVE_CAPTURE_SAMPLE_RATE', 1.0)
+
+def write_capture(kind, arrays, meta):
+    """
+    Write one solve as <SOLVE_CAPTURE_DIR>/<kind>-<timestamp>-<id>.npz.
+    Metadata is stored as a JSON string array so files load without pickle.
+    Failures are logged and never reach the caller.
+    """
+    np = get_backend('numpy')
+    try:
+        directory = settings.SOLVE_CAPTURE_DIR
+        os.makedirs(directory, exist_ok=True)
+        meta = dict(meta, kind=kind, version=CAPTURE_VERSION, captured_at=time.time())
+        path = os.path.join(directory, f"{kind}-{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}.npz")
+        np.savez(path, meta=np.array(json.dumps(meta)), **arrays)
+        return path
+    except OSError:
+        logger.exception("Could not write %s solve capture", kind)
+        return None
+
+def load_capture(path):
+    """
+    Load a capture as (meta, {name: array}).
+    """
+    np = get_backend('numpy')
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {name: data[name] for name in data.files if name != 'meta'}
+        meta = json.loads(str(data['meta']))
+    return meta, arrays
+
+def capture_line_balancing(lines, workers, assignment, solve_info):
+    if not solve_info or not capture_enabled():
+        return None
+    np = get_backend('numpy')
+    return write_capture('line_balancing', {
+        'worker_ids': np.array([w.id for w in workers], dtype=np.int64),
+        'worker_skilled': np.array([w.skill_level == 'skilled' for w in workers], dtype=bool),
+        'line_ids': np.array([line.id for line in lines], dtype=np.int64),
+        'line_min_workers': np.array([line.min_workers_required for line in lines], dtype=np.int64),
+        'line_max_workers': np.array([line.max_workers for line in lines], dtype=np.int64),
+        'line_skilled_ratio': np.array([line.skilled_ratio_required for line in lines], dtype=float),
+        'line_production_rate': np.array([line.production_rate for line in lines], dtype=float),
+        'line_priority': np.array([line.priority for line in lines], dtype=np.int64),
+        'assigned_line_ids': np.array([
+            assignment[w.id].id if w.id in assignment else -1 for w in workers
+        ], dtype=np.int64),
+    }, solve_info)
+
+def capture_knapsack(values, weights, capacity, selected_items, solve_info):
+    if not capture_enabled():
+        return None
+    np = get_backend('numpy')
+    selected = np.zeros(len(values), dtype=bool)
+    selected[list(selected_items)] = True
+    return write_capture('knapsack', {
+        'values': np.array(values, dtype=float),
+        'weights': np.array(weights, dtype=float),
+        'capacity': np.array(capacity, dtype=float),
+        'selected': selected,
+    }, solve_info)
+
+def capture_workforce_optimization(params_list, solutions, solve_time, engine):
+    """
+    Capture one or many workforce optimization solves as a single file.
+    """
+    if not params_list or not capture_enabled():
+        return None
+    np = get_backend('numpy')
+    return write_capture('workforce_optimization', {
+        'parameters': np.array([
+            [getattr(params, field) for field in PARAMETER_FIELDS]
+            for params in params_list
+        ], dtype=float),
+        'skilled_workers': np.array([s['skilled_workers'] for s in solutions], dtype=np.int64),
+        'semi_skilled_workers': np.array([s['semi_skilled_workers'] for s in solutions], dtype=np.int64),
+        'total_production': np.array([s['total_production'] for s in solutions], dtype=float),
+        'budget_used': np.array([s['budget_used'] for s in solutions], dtype=float),
+    }, {
+        'engine': engine,
+        'solve_time': round(solve_time, 6),
+        'parameter_fields': PARAMETER_FIELDS,
+    })
@@ -4,7 +4,7 @@ from .models import OptimizationParameters, ProductionLine
 class OptimizationForm(forms.ModelForm):
     class Meta:
         model = OptimizationParameters
-        fields = '__all__'
+        exclude = ['site']
 
 class ProductionLineForm(forms.ModelForm):
     class Meta:
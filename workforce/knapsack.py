@@ -1,47 +1,103 @@
-from pulp import *
-import numpy as np
+from .backends import get_backend
+from .solver import get_budget, solve_with_budget, iter_incumbents
+from .capture import capture_knapsack
 
-def solve_knapsack(values, weights, capacity):
+def build_knapsack_problem(values, weights, capacity):
     """
-    Solve the 0/1 Knapsack problem using integer programming.
-    
-    Args:
-        values (list): List of item values
-        weights (list): List of item weights
-        capacity (float): Maximum capacity of the knapsack
-        
-    Returns:
-        tuple: (selected_items, total_value, total_weight)
+    Build the 0/1 Knapsack integer program.
+    Returns the problem and its binary item variables.
     """
+    pulp = get_backend('pulp')
     n = len(values)
     
     # Create the optimization problem
-    prob = LpProblem("Knapsack_Problem", LpMaximize)
+    prob = pulp.LpProblem("Knapsack_Problem", pulp.LpMaximize)
     
     # Create binary variables for each item
-    x = LpVariable.dicts("item", range(n), 0, 1, LpBinary)
+    x = pulp.LpVariable.dicts("item", range(n), 0, 1, pulp.LpBinary)
     
     # Objective function: maximize total value
-    prob += lpSum([values[i] * x[i] for i in range(n)])
+    prob += pulp.lpSum([values[i] * x[i] for i in range(n)])
     
     # Constraint: total weight must be less than or equal to capacity
-    prob += lpSum([weights[i] * x[i] for i in range(n)]) <= capacity
+    prob += pulp.lpSum([weights[i] * x[i] for i in range(n)]) <= capacity
+    
+    return prob, x
+
+def fractional_bound(values, weights, capacity):
+    """
+    Upper bound on the knapsack optimum from its LP relaxation (Dantzig bound):
+    take items greedily by value density and a fraction of the first that does not fit.
+    """
+    bound = 0.0
+    remaining = capacity
+    items = sorted(
+        (i for i in range(len(values)) if values[i] > 0),
+        key=lambda i: values[i] / weights[i] if weights[i] > 0 else float('inf'),
+        reverse=True
+    )
+    for i in items:
+        if weights[i] <= remaining:
+            bound += values[i]
+            remaining -= weights[i]
+        else:
+            bound += values[i] * remaining / weights[i]
+            break
+    return bound
+
+def _read_solution(x, weights):
+    selected_items = [i for i in range(len(weights)) if (x[i].value() or 0) > 0.5]
+    total_weight = sum(weights[i] for i in selected_items)
+    return selected_items, total_weight
+
+def solve_knapsack(values, weights, capacity, budget=None):
+    """
+    Solve the 0/1 Knapsack problem using integer programming.
     
-    # Solve the problem
-    prob.solve()
+    Args:
+        values (list): List of item values
+        weights (list): List of item weights
+        capacity (float): Maximum capacity of the knapsack
+        budget (dict): Time and MIP-gap budget, defaults to the 'knapsack' budget
+        
+    Returns:
+        tuple: (selected_items, total_value, total_weight, solve_info)
+    """
+    prob, x = build_knapsack_problem(values, weights, capacity)
+    
+    # Solve the problem, keeping the best incumbent found within the budget
+    solve_info = solve_with_budget(
+        prob, budget or get_budget('knapsack'),
+        bound=lambda: fractional_bound(values, weights, capacity)
+    )
     
     # Get the results
-    selected_items = [i for i in range(n) if x[i].value() == 1]
-    total_value = value(prob.objective)
-    total_weight = sum(weights[i] for i in selected_items)
+    selected_items, total_weight = _read_solution(x, weights)
+    total_value = sum(values[i] for i in selected_items)
+    capture_knapsack(values, weights, capacity, selected_items, solve_info)
+    
+    return selected_items, total_value, total_weight, solve_info
+
+def iter_knapsack_incumbents(values, weights, capacity, budget=None):
+    """
+    Yield (selected_items, total_value, total_weight, solve_info) for every improving
+    incumbent found within the budget, ending with the final result.
+    """
+    prob, x = build_knapsack_problem(values, weights, capacity)
     
-    return selected_items, total_value, total_weight
+    for solve_info in iter_incumbents(
+        prob, budget or get_budget('knapsack_stream'),
+        bound=lambda: fractional_bound(values, weights, capacity)
+    ):
+        selected_items, total_weight = _read_solution(x, weights)
+        total_value = sum(values[i] for i in selected_items)
+        yield selected_items, total_value, total_weight, solve_info
 
-def format_solution(selected_items, total_value, total_weight, values, weights):
+def format_solution(selected_items, total_value, total_weight, values, weights, solve_info=None):
     """
     Format the solution for display.
     """
-    return {
+    solution = {
         'selected_items': selected_items,
         'total_value': round(total_value, 2),
         'total_weight': round(total_weight, 2),
@@ -54,4 +110,9 @@ def format_solution(selected_items, total_value, total_weight, values, weights):
             }
             for i in range(len(values))
         ]
-    } 
\ No newline at end of file
+    }
+    if solve_info is not None:
+        solution['status'] = solve_info['status']
+        solution['gap'] = solve_info['gap']
+        solution['solve_time'] = solve_info['solve_time']
+    return solution
@@ -0,0 +1,694 @@
+import math
+import threading
+import time
+from .backends import get_backend
+from .solver import solve_with_budget, relaxation_bound, has_incumbent
+
+# How often the heuristic engine settled a shift on its own (certified optimal or
+# proven infeasible) and how often it had to escalate to the exact MILP, either
+# short of its bound or without any solution. Counters are per worker process.
+_stats_lock = threading.Lock()
+ENGINE_STATS = {
+    'solves': 0,
+    'certified': 0,
+    'infeasible': 0,
+    'escalated_gap': 0,
+    'escalated_failed': 0,
+}
+
+# Compiled line-balancing models keyed by production-line configuration.
+# Cleared whenever a ProductionLine is saved or deleted (see signals.py).
+MAX_COMPILED_MODELS = 32
+_compiled_models = {}
+_compiled_lock = threading.Lock()
+
+# Largest (lines x worker counts x skilled demands x line sizes) table the exact
+# count search may fill before the heuristic leaves the shift to the MILP
+MAX_EXACT_WORK = 50000
+
+def record_outcome(outcome):
+    """
+    Count one heuristic outcome: 'certified', 'infeasible', 'escalated_gap' or 'escalated_failed'.
+    """
+    with _stats_lock:
+        ENGINE_STATS['solves'] += 1
+        ENGINE_STATS[outcome] += 1
+
+def engine_stats():
+    """
+    Snapshot of the engine counters with the resulting escalation rate.
+    """
+    with _stats_lock:
+        stats = dict(ENGINE_STATS)
+    escalated = stats['escalated_gap'] + stats['escalated_failed']
+    stats['escalation_rate'] = escalated / stats['solves'] if stats['solves'] else 0.0
+    return stats
+
+def skilled_needed(line, count):
+    """
+    Smallest number of skilled workers meeting the line's skilled ratio for count workers.
+    """
+    return math.ceil(line.skilled_ratio_required * count - 1e-9)
+
+def line_weight(line):
+    # Same per-worker objective coefficient as the MILP
+    return line.production_rate * line.priority
+
+def _objective(lines, counts):
+    return sum(line_weight(line) * c for line, c in zip(lines, counts))
+
+def _skill_demand(lines, counts):
+    return sum(skilled_needed(line, c) for line, c in zip(lines, counts))
+
+def _reaches(objective, bound):
+    return objective >= bound - 1e-9 * max(abs(bound), 1.0)
+
+def upper_bound_counts(lines, n_workers):
+    """
+    Optimal worker counts per line when the skilled ratio is ignored.
+
+    Without the ratio the MILP only depends on how many workers each line gets,
+    and its LP relaxation is integral: give every line its minimum, then fill the
+    lines with the highest weight up to their maximum. Returns None if the line
+    limits cannot absorb exactly n_workers.
+    """
+    counts = [line.min_workers_required for line in lines]
+    remaining = n_workers - sum(counts)
+    if remaining < 0 or any(line.min_workers_required > line.max_workers for line in lines):
+        return None
+    order = sorted(
+        range(len(lines)),
+        key=lambda i: (line_weight(lines[i]), lines[i].priority),
+        reverse=True
+    )
+    for i in order:
+        extra = min(remaining, lines[i].max_workers - counts[i])
+        counts[i] += extra
+        remaining -= extra
+    if remaining > 0:
+        return None
+    return counts
+
+def relaxation_bound_counts(lines, n_skilled, n_workers):
+    """
+    Bound on the optimum from the LP relaxation of the count model, skilled ratios included.
+
+    Relaxed, a line with c workers needs ratio * c skilled workers, so the LP is
+    max sum(w * c) subject to sum(c) = n_workers, sum(ratio * c) <= n_skilled and
+    the line limits. Its value is the minimum over lam >= 0 of lam * n_skilled plus
+    the best fill by the weights w - lam * ratio. That function is convex and piecewise
+    linear, so its minimum lies at lam = 0 or where two lines swap order.
+
+    Returns:
+        tuple: (bound, minimizing lam), or None if the relaxation, and so the MILP,
+            is infeasible
+    """
+    weights = [line_weight(line) for line in lines]
+    ratios = [line.skilled_ratio_required for line in lines]
+    # A skilled ratio above 1 can only be met by leaving the line empty
+    limits = [
+        (line.min_workers_required, line.max_workers if ratio <= 1 else 0)
+        for line, ratio in zip(lines, ratios)
+    ]
+    if (any(low > high for low, high in limits)
+            or sum(low for low, _ in limits) > n_workers
+            or sum(high for _, high in limits) < n_workers):
+        return None
+
+    def fill(keys):
+        counts = [low for low, _ in limits]
+        remaining = n_workers - sum(counts)
+        for i in sorted(range(len(lines)), key=keys.__getitem__, reverse=True):
+            extra = min(remaining, limits[i][1] - counts[i])
+            counts[i] += extra
+            remaining -= extra
+        return counts
+
+    # Even the fill needing the fewest skilled workers needs too many
+    least = fill([-ratio for ratio in ratios])
+    if sum(ratio * c for ratio, c in zip(ratios, least)) > n_skilled + 1e-9:
+        return None
+
+    def dual(lam):
+        keys = [w - lam * ratio for w, ratio in zip(weights, ratios)]
+        return lam * n_skilled + sum(k * c for k, c in zip(keys, fill(keys)))
+
+    lams = {0.0}
+    for i in range(len(lines)):
+        for j in range(i):
+            if ratios[i] != ratios[j]:
+                lam = (weights[i] - weights[j]) / (ratios[i] - ratios[j])
+                if lam > 0:
+                    lams.add(lam)
+    return min((dual(lam), lam) for lam in lams)
+
+def _allocate(lines, n_workers, value):
+    """
+    Counts per line placing exactly n_workers that maximize the sum of value(i, count)
+    over the lines, by dynamic programming over the workers placed. Only counts whose
+    skilled ratio can be met are considered. Returns (total, counts) or None.
+    """
+    # states[placed] = (total, counts so far)
+    states = {0: (0.0, ())}
+    for i, line in enumerate(lines):
+        options = [
+            (c, value(i, c))
+            for c in range(line.min_workers_required, line.max_workers + 1)
+            if skilled_needed(line, c) <= c
+        ]
+        next_states = {}
+        for placed, (total, counts) in states.items():
+            for c, v in options:
+                key = placed + c
+                if key > n_workers:
+                    break
+                if key not in next_states or total + v > next_states[key][0] + 1e-12:
+                    next_states[key] = (total + v, counts + (c,))
+        states = next_states
+    best = states.get(n_workers)
+    return (best[0], list(best[1])) if best else None
+
+def _best_move(lines, counts, n_skilled, repair):
+    """
+    Best single-worker move between two lines.
+    In repair mode the move must lower the skilled demand, or keep it while moving the
+    worker to a line with a lower skilled ratio, at the least objective loss; otherwise it must raise the objective while keeping the skilled demand within n_skilled.
+    """
+    demand = _skill_demand(lines, counts)
+    best = None
+    best_key = None
+    for a, line_a in enumerate(lines):
+        if counts[a] <= line_a.min_workers_required:
+            continue
+        need_a = skilled_needed(line_a, counts[a] - 1) - skilled_needed(line_a, counts[a])
+        for b, line_b in enumerate(lines):
+            if a == b or counts[b] >= line_b.max_workers:
+                continue
+            need_b = skilled_needed(line_b, counts[b] + 1) - skilled_needed(line_b, counts[b])
+            delta_need = need_a + need_b
+            delta_obj = line_weight(line_b) - line_weight(line_a)
+            delta_ratio = line_b.skilled_ratio_required - line_a.skilled_ratio_required
+            if repair and (delta_need > 0 or (delta_need == 0 and delta_ratio >= 0)):
+                continue
+            if not repair and (delta_obj <= 1e-9 or demand + delta_need > n_skilled):
+                continue
+            key = (delta_obj, -delta_need, -delta_ratio)
+            if best_key is None or key > best_key:
+                best, best_key = (a, b), key
+    return best
+
+def _lower_step(line, count):
+    """
+    Largest count below count that needs fewer skilled workers, or None.
+    """
+    need = skilled_needed(line, count)
+    for lower in range(count - 1, line.min_workers_required - 1, -1):
+        if skilled_needed(line, lower) < need:
+            return lower
+    return None
+
+def _neutral_room(line, count):
+    """
+    Workers the line can take without needing another skilled worker.
+    """
+    need = skilled_needed(line, count)
+    room = 0
+    while count + room < line.max_workers and skilled_needed(line, count + room + 1) == need:
+        room += 1
+    return room
+
+def _drop_move(lines, counts):
+    """
+    Compound repair move that lowers the skilled demand by at least one.
+
+    One line drops to the largest count that needs fewer skilled workers, and the
+    freed workers go to the highest-weight lines that take them without needing
+    another skilled worker. Single-worker moves get stuck when all lines share a
+    ratio; this crosses such plateaus. Returns the new counts with the least
+    objective loss, or None.
+    """
+    rooms = [_neutral_room(line, c) for line, c in zip(lines, counts)]
+    order = sorted(range(len(lines)), key=lambda i: line_weight(lines[i]), reverse=True)
+    best = None
+    best_objective = None
+    for a, line_a in enumerate(lines):
+        lower = _lower_step(line_a, counts[a])
+        if lower is None:
+            continue
+        moved = list(counts)
+        moved[a] = lower
+        freed = counts[a] - lower
+        for b in order:
+            if b == a or not freed:
+                continue
+            take = min(freed, rooms[b])
+            moved[b] += take
+            freed -= take
+        if freed:
+            continue
+        objective = _objective(lines, moved)
+        if best_objective is None or objective > best_objective:
+            best, best_objective = moved, objective
+    return best
+
+def exact_counts(lines, n_skilled, n_workers):
+    """
+    Optimal worker counts per line by dynamic programming over (workers placed,
+    skilled workers needed), line by line. The objective only depends on the counts,
+    so this is the optimum of the MILP.
+
+    Returns:
+        tuple: (counts or None if infeasible, solved) where solved is False when the
+            table would exceed MAX_EXACT_WORK and nothing was computed
+    """
+    widths = [max(line.max_workers - line.min_workers_required + 1, 0) for line in lines]
+    if len(lines) * (n_workers + 1) * (n_skilled + 1) * max(widths, default=1) > MAX_EXACT_WORK:
+        return None, False
+
+    # states[(placed, needed)] = (objective, counts so far)
+    states = {(0, 0): (0.0, ())}
+    for line in lines:
+        weight = line_weight(line)
+        options = [
+            (c, skilled_needed(line, c))
+            for c in range(line.min_workers_required, line.max_workers + 1)
+            if skilled_needed(line, c) <= c
+        ]
+        next_states = {}
+        for (placed, needed), (objective, counts) in states.items():
+            for c, need in options:
+                key = (placed + c, needed + need)
+                if key[0] > n_workers or key[1] > n_skilled:
+                    continue
+                value = objective + weight * c
+                if key not in next_states or value > next_states[key][0] + 1e-12:
+                    next_states[key] = (value, counts + (c,))
+        states = next_states
+
+    best = max(
+        (state for (placed, needed), state in states.items() if placed == n_workers),
+        key=lambda state: state[0], default=None
+    )
+    return (list(best[1]) if best else None), True
+
+def heuristic_counts(lines, n_skilled, n_semi_skilled):
+    """
+    Greedy worker counts per line improved by local-search moves, bounded by
+    relaxation_bound_counts. When local search fails or stops short of the bound,
+    small instances are solved exactly by exact_counts, whose objective then serves
+    as the (tight) bound. Larger ones fall back to one-dimensional allocations over
+    the workers placed: the counts needing the fewest skilled workers either prove
+    infeasibility or restart local search, and the Lagrangian of the skilled pool
+    at the relaxation's multiplier tightens the bound.
+
+    Returns:
+        tuple: (counts or None if no feasible counts were found, upper bound), where
+            the bound is None when the instance was proven infeasible
+    """
+    n_workers = n_skilled + n_semi_skilled
+    counts = upper_bound_counts(lines, n_workers)
+    if counts is None:
+        return None, None
+    relaxation = relaxation_bound_counts(lines, n_skilled, n_workers)
+    if relaxation is None:
+        return None, None
+    bound, lam = relaxation
+    counts = _local_search(lines, counts, n_skilled)
+    if counts is not None and _reaches(_objective(lines, counts), bound):
+        return counts, bound
+
+    exact, solved = exact_counts(lines, n_skilled, n_workers)
+    if solved:
+        if exact is None:
+            return None, None
+        return exact, _objective(lines, exact)
+
+    widths = [max(line.max_workers - line.min_workers_required + 1, 0) for line in lines]
+    if len(lines) * (n_workers + 1) * max(widths, default=1) > MAX_EXACT_WORK:
+        return counts, bound
+    if counts is None:
+        least = _allocate(lines, n_workers, lambda i, c: -skilled_needed(lines[i], c))
+        if least is None or -least[0] > n_skilled:
+            return None, None
+        counts = _local_search(lines, least[1], n_skilled)
+        if _reaches(_objective(lines, counts), bound):
+            return counts, bound
+    relaxed = _allocate(
+        lines, n_workers,
+        lambda i, c: line_weight(lines[i]) * c - lam * skilled_needed(lines[i], c)
+    )
+    if relaxed is not None:
+        bound = min(bound, lam * n_skilled + relaxed[0])
+    return counts, bound
+
+def _local_search(lines, counts, n_skilled):
+    """
+    Repair the skilled demand of counts, then raise the objective with single moves.
+    Returns the improved counts, or None if the repair failed.
+    """
+    n_workers = sum(counts)
+
+    # Repair: move workers off lines whose skilled ratio cannot be met, preferring
+    # moves that lower the skilled demand over moves to lines with a lower ratio
+    max_moves = n_workers * len(lines) + 1
+    moves = 0
+    while _skill_demand(lines, counts) > n_skilled:
+        if moves >= max_moves:
+            return None
+        moves += 1
+        dropped = _drop_move(lines, counts)
+        if dropped is not None:
+            counts = dropped
+            continue
+        move = _best_move(lines, counts, n_skilled, repair=True)
+        if move is None:
+            return None
+        counts[move[0]] -= 1
+        counts[move[1]] += 1
+
+    # Improve: move workers to higher-weight lines while the skill pool allows
+    while moves < max_moves:
+        move = _best_move(lines, counts, n_skilled, repair=False)
+        if move is None:
+            break
+        counts[move[0]] -= 1
+        counts[move[1]] += 1
+        moves += 1
+
+    # A skilled ratio above 1 can only be met by leaving the line empty
+    if any(skilled_needed(line, c) > c for line, c in zip(lines, counts)):
+        return None
+
+    return counts
+
+def assign_by_counts(lines, counts, workers):
+    """
+    Map workers to lines so every line gets its count and its skilled minimum.
+    Returns {worker id: line}.
+    """
+    skilled = [w for w in workers if w.skill_level == 'skilled']
+    others = [w for w in workers if w.skill_level != 'skilled']
+    assignment = {}
+    open_slots = []
+    for line, count in zip(lines, counts):
+        need = skilled_needed(line, count)
+        for worker in skilled[:need]:
+            assignment[worker.id] = line
+        skilled = skilled[need:]
+        open_slots.extend([line] * (count - need))
+    for worker, line in zip(others + skilled, open_slots):
+        assignment[worker.id] = line
+    return assignment
+
+def heuristic_balance(lines, workers):
+    """
+    Balance workers across production lines without a solver.
+
+    The result is certified optimal when its objective reaches the bound from
+    relaxation_bound_counts, or when exact_counts solved the instance, and
+    'infeasible' only when infeasibility was proven. Otherwise ('feasible' short of
+    the bound, or 'failed' without any solution) the caller should fall back to the
+    exact MILP.
+
+    Returns:
+        dict: status ('optimal', 'feasible', 'infeasible' or 'failed'), assignment
+            ({worker id: line}), objective, bound, gap and solve_time
+    """
+    started = time.perf_counter()
+    n_skilled = sum(1 for w in workers if w.skill_level == 'skilled')
+    counts, bound = heuristic_counts(lines, n_skilled, len(workers) - n_skilled)
+
+    if counts is None:
+        return {
+            'status': 'failed' if bound is not None else 'infeasible',
+            'assignment': {},
+            'objective': None,
+            'bound': bound,
+            'gap': None,
+            'solve_time': round(time.perf_counter() - started, 6),
+        }
+
+    objective = _objective(lines, counts)
+    gap = abs(bound - objective) / max(abs(bound), 1e-9)
+    return {
+        'status': 'optimal' if gap <= 1e-9 else 'feasible',
+        'assignment': assign_by_counts(lines, counts, workers),
+        'objective': objective,
+        'bound': bound,
+        'gap': 0.0 if gap <= 1e-9 else gap,
+        'solve_time': round(time.perf_counter() - started, 6),
+    }
+
+def balance_workers(lines, workers, budget, engine='auto'):
+    """
+    Assign workers to production lines without touching the database.
+
+    Args:
+        lines (list): Production lines, in priority order
+        workers (list): Workers on the shift
+        budget (dict): Time and MIP-gap budget for the MILP
+        engine (str): 'auto' runs the heuristic and escalates to the MILP unless it is
+            certified optimal or proved the shift infeasible; 'heuristic' and 'milp'
+            run only that engine. After an escalation the better of the heuristic and
+            MILP incumbents is kept.
+
+    Returns:
+        tuple: ({worker id: line}, solve_info)
+    """
+    heuristic = None
+    if engine in ('auto', 'heuristic'):
+        heuristic = heuristic_balance(lines, workers)
+        if engine == 'heuristic' or heuristic['status'] in ('optimal', 'infeasible'):
+            if engine == 'auto':
+                record_outcome('certified' if heuristic['status'] == 'optimal' else 'infeasible')
+            solve_info = {
+                'engine': 'heuristic',
+                'status': heuristic['status'],
+                'objective': heuristic['objective'],
+                'gap': heuristic['gap'],
+                'solve_time': heuristic['solve_time'],
+            }
+            return heuristic['assignment'], solve_info
+        record_outcome('escalated_gap' if heuristic['status'] == 'feasible' else 'escalated_failed')
+
+    # Warm start the MILP from the heuristic incumbent when there is one
+    start = None
+    if heuristic and heuristic['assignment']:
+        start = skill_counts_from_assignment(lines, heuristic['assignment'], workers)
+
+    n_skilled = sum(1 for w in workers if w.skill_level == 'skilled')
+    counts, solve_info = get_compiled_model(lines).solve(
+        n_skilled, len(workers) - n_skilled, budget, start
+    )
+    solve_info['engine'] = 'milp'
+    if heuristic:
+        solve_info['escalation'] = heuristic['status']
+
+    # The MILP can time out without an incumbent or end below its warm start
+    if heuristic and heuristic['status'] == 'feasible' and (
+        counts is None or solve_info['objective'] < heuristic['objective']
+    ):
+        solve_info.update(
+            engine='heuristic',
+            status='feasible',
+            objective=heuristic['objective'],
+            gap=heuristic['gap'],
+        )
+        return heuristic['assignment'], solve_info
+
+    assignment = {}
+    if counts is not None:
+        assignment = assign_by_skill_counts(lines, counts, workers)
+    return assignment, solve_info
+
+def line_config_key(lines):
+    """
+    Everything about the production lines that the compiled model depends on.
+    """
+    return tuple(
+        (line.id, line.min_workers_required, line.max_workers,
+         line.skilled_ratio_required, line.production_rate, line.priority)
+        for line in lines
+    )
+
+def get_compiled_model(lines):
+    """
+    Return the compiled model for this production-line configuration, compiling it on first use.
+    """
+    key = line_config_key(lines)
+    with _compiled_lock:
+        model = _compiled_models.get(key)
+        if model is None:
+            if len(_compiled_models) >= MAX_COMPILED_MODELS:
+                _compiled_models.clear()
+            model = _compiled_models[key] = CompiledLineModel(lines)
+    return model
+
+def clear_compiled_models():
+    with _compiled_lock:
+        _compiled_models.clear()
+
+class CompiledLineModel:
+    """
+    Line-balancing MILP compiled once per production-line configuration.
+
+    Workers with the same skill are interchangeable in the objective and in every
+    constraint, so instead of one binary per worker and line the model has two
+    integer counts per line: skilled workers and semi-skilled workers. The rows are
+    kept as a CSR matrix (indptr, indices, data) with senses and right-hand sides,
+    which are shared and never change. PuLP problems are assembled from them on
+    demand and kept in a small pool, so concurrent shifts with the same lines
+    solve side by side; a solve only swaps in the right-hand sides of the two
+    skill-pool rows.
+    """
+    SKILLED_POOL = 'skilled_pool'
+    SEMI_SKILLED_POOL = 'semi_skilled_pool'
+
+    # Idle problems kept for reuse; concurrent solves beyond this build their own
+    MAX_IDLE_PROBLEMS = 4
+
+    def __init__(self, lines):
+        np = get_backend('numpy')
+        pulp = get_backend('pulp')
+        self.lines = list(lines)
+        self.lock = threading.Lock()
+        self.idle = []
+        n_lines = len(self.lines)
+
+        # Columns: skilled count per line, then semi-skilled count per line
+        skilled = list(range(n_lines))
+        semi_skilled = list(range(n_lines, 2 * n_lines))
+        rows = [
+            (self.SKILLED_POOL, skilled, [1.0] * n_lines, pulp.LpConstraintEQ, 0.0),
+            (self.SEMI_SKILLED_POOL, semi_skilled, [1.0] * n_lines, pulp.LpConstraintEQ, 0.0),
+        ]
+        for i, line in enumerate(self.lines):
+            columns = [skilled[i], semi_skilled[i]]
+            ratio = line.skilled_ratio_required
+            rows.append((f"min_workers_{line.id}", columns, [1.0, 1.0], pulp.LpConstraintGE, line.min_workers_required))
+            rows.append((f"max_workers_{line.id}", columns, [1.0, 1.0], pulp.LpConstraintLE, line.max_workers))
+            rows.append((f"skilled_ratio_{line.id}", columns, [1.0 - ratio, -ratio], pulp.LpConstraintGE, 0.0))
+
+        self.row_names = [row[0] for row in rows]
+        self.indptr = np.cumsum([0] + [len(row[1]) for row in rows])
+        self.indices = np.array([j for row in rows for j in row[1]], dtype=np.int64)
+        self.data = np.array([a for row in rows for a in row[2]], dtype=float)
+        self.senses = np.array([row[3] for row in rows], dtype=np.int64)
+        self.rhs = np.array([row[4] for row in rows], dtype=float)
+        weights = np.array([line_weight(line) for line in self.lines], dtype=float)
+        self.objective = np.concatenate([weights, weights])
+        upper = np.array([max(line.max_workers, 0) for line in self.lines])
+        self.upper = np.concatenate([upper, upper])
+
+    def problem(self):
+        """
+        A fresh LineProblem assembled from the compiled rows, owned by the caller.
+        """
+        return LineProblem(self)
+
+    def solve(self, n_skilled, n_semi_skilled, budget, start=None):
+        """
+        Solve for one shift's skill partition within budget, on an idle pooled problem.
+
+        Args:
+            n_skilled (int): Skilled workers on the shift
+            n_semi_skilled (int): Semi-skilled workers on the shift
+            budget (dict): Time and MIP-gap budget
+            start (list): Optional (skilled, semi-skilled) counts per line to warm-start from
+
+        Returns:
+            tuple: ((skilled, semi-skilled) counts per line or None, solve_info)
+        """
+        with self.lock:
+            problem = self.idle.pop() if self.idle else None
+        if problem is None:
+            problem = self.problem()
+        try:
+            return problem.solve(n_skilled, n_semi_skilled, budget, start)
+        finally:
+            with self.lock:
+                if len(self.idle) < self.MAX_IDLE_PROBLEMS:
+                    self.idle.append(problem)
+
+class LineProblem:
+    """
+    One PuLP problem built from a CompiledLineModel; not safe to share between threads.
+    """
+
+    def __init__(self, model):
+        pulp = get_backend('pulp')
+        self.model = model
+        self.variables = [
+            pulp.LpVariable(f"{skill}_line_{line.id}", 0, int(model.upper[j]), pulp.LpInteger)
+            for j, (skill, line) in enumerate(
+                [('skilled', line) for line in model.lines] + [('semi_skilled', line) for line in model.lines]
+            )
+        ]
+        self.prob = pulp.LpProblem("ProductionLineBalancing", pulp.LpMaximize)
+        self.prob += pulp.LpAffineExpression(zip(self.variables, model.objective.tolist()))
+        for k, name in enumerate(model.row_names):
+            start, end = model.indptr[k], model.indptr[k + 1]
+            expr = pulp.LpAffineExpression([
+                (self.variables[j], a)
+                for j, a in zip(model.indices[start:end].tolist(), model.data[start:end].tolist())
+            ])
+            self.prob += pulp.LpConstraint(expr, sense=int(model.senses[k]), name=name, rhs=float(model.rhs[k]))
+
+    def set_pools(self, n_skilled, n_semi_skilled):
+        self.prob.constraints[CompiledLineModel.SKILLED_POOL].changeRHS(n_skilled)
+        self.prob.constraints[CompiledLineModel.SEMI_SKILLED_POOL].changeRHS(n_semi_skilled)
+
+    def solve(self, n_skilled, n_semi_skilled, budget, start=None):
+        """
+        Same arguments and result as CompiledLineModel.solve.
+        """
+        self.set_pools(n_skilled, n_semi_skilled)
+        if start:
+            n_lines = len(self.model.lines)
+            for i, (skilled, semi_skilled) in enumerate(start):
+                self.variables[i].setInitialValue(skilled)
+                self.variables[n_lines + i].setInitialValue(semi_skilled)
+        solve_info = solve_with_budget(
+            self.prob, budget,
+            bound=lambda: relaxation_bound(self.prob, budget['time_limit']),
+            warm_start=bool(start)
+        )
+        counts = self.read_counts() if has_incumbent(solve_info) else None
+        return counts, solve_info
+
+    def read_counts(self):
+        """
+        (skilled, semi-skilled) counts per line held by the current incumbent.
+        """
+        n_lines = len(self.model.lines)
+        values = [int(round(v.varValue or 0)) for v in self.variables]
+        return list(zip(values[:n_lines], values[n_lines:]))
+
+def skill_counts_from_assignment(lines, assignment, workers):
+    """
+    (skilled, semi-skilled) counts per line of a {worker id: line} assignment.
+    """
+    position = {line.id: i for i, line in enumerate(lines)}
+    counts = [[0, 0] for _ in lines]
+    for worker in workers:
+        line = assignment.get(worker.id)
+        if line is not None:
+            counts[position[line.id]][0 if worker.skill_level == 'skilled' else 1] += 1
+    return [tuple(c) for c in counts]
+
+def assign_by_skill_counts(lines, counts, workers):
+    """
+    Map workers to lines from (skilled, semi-skilled) counts per line.
+    Returns {worker id: line}.
+    """
+    skilled = [w for w in workers if w.skill_level == 'skilled']
+    others = [w for w in workers if w.skill_level != 'skilled']
+    assignment = {}
+    for line, (n_skilled, n_semi_skilled) in zip(lines, counts):
+        for worker in skilled[:n_skilled]:
+            assignment[worker.id] = line
+        for worker in others[:n_semi_skilled]:
+            assignment[worker.id] = line
+        skilled = skilled[n_skilled:]
+        others = others[n_semi_skilled:]
+    return assignment
@@ -0,0 +1,59 @@
+import json
+import os
+import subprocess
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Modules a cold worker must not import before its first solve
+LAZY_MODULES = ['pulp', 'numpy', 'pandas', 'scipy']
+
+# Runs in a fresh interpreter so nothing already imported by manage.py skews the timing
+PROBE = """
+import json, os, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+import workforce.views
+elapsed_ms = (time.perf_counter() - started) * 1000
+print(json.dumps({
+    'elapsed_ms': elapsed_ms,
+    'eager': [m for m in %r if m in sys.modules],
+}))
+"""
+
+
+class Command(BaseCommand):
+    help = 'Check that app startup stays within its import-time budget and keeps solver backends lazy'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--budget-ms', type=float, default=None,
+                            help='Override settings.IMPORT_TIME_BUDGET_MS')
+        parser.add_argument('--runs', type=int, default=3,
+                            help='Cold starts to measure; the fastest is compared with the budget')
+
+    def handle(self, *args, **options):
+        budget_ms = options['budget_ms'] or getattr(settings, 'IMPORT_TIME_BUDGET_MS', 1000)
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'workforce.settings'))
+
+        samples = []
+        for _ in range(max(options['runs'], 1)):
+            completed = subprocess.run(
+                [sys.executable, '-c', PROBE % LAZY_MODULES],
+                capture_output=True, text=True, env=env, cwd=str(settings.BASE_DIR)
+            )
+            if completed.returncode != 0:
+                raise CommandError(f'Import probe failed:\n{completed.stderr}')
+            samples.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+        best = min(samples, key=lambda s: s['elapsed_ms'])
+        self.stdout.write(f"Startup import time: {best['elapsed_ms']:.1f} ms (budget {budget_ms:.0f} ms)")
+
+        if best['eager']:
+            raise CommandError(f"Imported at startup instead of on first use: {', '.join(best['eager'])}")
+        if best['elapsed_ms'] > budget_ms:
+            raise CommandError(f"Startup import time {best['elapsed_ms']:.1f} ms exceeds the {budget_ms:.0f} ms budget")
+
+        self.stdout.write(self.style.SUCCESS('Import-time budget OK'))
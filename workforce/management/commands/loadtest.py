@@ -0,0 +1,393 @@
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+# Relative weight of each kind of request in the traffic mix
+DEFAULT_MIX = {
+    'dashboard': 4,
+    'production_lines': 2,
+    'optimize': 1,
+    'knapsack': 3,
+}
+
+OPTIMIZATION_FORM = {
+    'skilled_cost': 300,
+    'semi_skilled_cost': 150,
+    'skilled_production': 10,
+    'semi_skilled_production': 4,
+    'budget': 6000,
+    'min_production': 100,
+    'max_skilled_workers': 30,
+    'max_semi_skilled_workers': 60,
+}
+
+def percentile(sorted_values, q):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(q / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+def summarize(samples, elapsed):
+    """
+    Throughput, error rate and latency percentiles (ms) of (latency, ok) samples.
+    """
+    latencies = sorted(latency * 1000 for latency, ok in samples)
+    errors = sum(1 for latency, ok in samples if not ok)
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'error_rate': errors / len(samples) if samples else 0.0,
+        'throughput': len(samples) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+        'max_ms': latencies[-1] if latencies else None,
+    }
+
+async def http_request(host, port, method, path, body=b'', headers=None):
+    """
+    Minimal HTTP/1.1 request over a fresh connection. Returns (status, headers, body).
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    lines = [
+        f"{method} {path} HTTP/1.1",
+        f"Host: {host}:{port}",
+        "Connection: close",
+        f"Content-Length: {len(body)}",
+    ]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, content = response.partition(b"\r\n\r\n")
+    head_lines = head.decode('latin-1').split("\r\n")
+    status = int(head_lines[0].split(' ', 2)[1])
+    response_headers = [
+        (name.strip(), value.strip())
+        for name, _, value in (line.partition(':') for line in head_lines[1:])
+    ]
+    return status, response_headers, content
+
+class Command(BaseCommand):
+    help = (
+        'Start the app against a seeded SQLite database and drive mixed concurrent traffic at it, '
+        'reporting throughput, latency percentiles, error rates and SQLite lock contention'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=16, help='Concurrent simulated planners')
+        parser.add_argument('--duration', type=float, default=30, help='Seconds of traffic')
+        parser.add_argument('--warmup', type=float, default=2, help='Seconds of traffic excluded from the results')
+        parser.add_argument('--database', default=str(Path(settings.BASE_DIR) / 'loadtest.sqlite3'),
+                            help='SQLite file to seed; recreated on every run')
+        parser.add_argument('--workers', type=int, default=200, help='Workers to seed')
+        parser.add_argument('--lines', type=int, default=8, help='Production lines to seed')
+        parser.add_argument('--days', type=int, default=7, help='Days of scheduled shifts to seed')
+        parser.add_argument('--knapsack-sizes', default='10,100,500', help='Comma-separated knapsack item counts')
+        parser.add_argument('--mix', default=None,
+                            help='Traffic weights, e.g. dashboard=4,production_lines=2,optimize=1,knapsack=3')
+        parser.add_argument('--port', type=int, default=0, help='Server port (default: a free port)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for data and traffic')
+        parser.add_argument('--output', default=None, help='Write results as JSON to this file')
+        parser.add_argument('--compare', default=None, help='Earlier results file to compare against')
+        parser.add_argument('--serve', action='store_true', help='Internal: run the instrumented server')
+        parser.add_argument('--stats-file', default=None, help='Internal: where the server writes lock stats')
+
+    def handle(self, *args, **options):
+        use_database(options['database'])
+        if options['serve']:
+            return self.serve(options)
+
+        mix = dict(DEFAULT_MIX)
+        if options['mix']:
+            mix = {}
+            for part in options['mix'].split(','):
+                name, _, weight = part.partition('=')
+                if name not in DEFAULT_MIX:
+                    raise CommandError(f"Unknown request kind '{name}' in --mix")
+                mix[name] = float(weight)
+        knapsack_sizes = [int(n) for n in options['knapsack_sizes'].split(',') if n]
+
+        self.stdout.write(f"Seeding {options['database']}")
+        seed_database(options['database'], options['workers'], options['lines'], options['days'], options['seed'])
+
+        port = options['port'] or free_port()
+        stats_file = f"{options['database']}.server-stats.json"
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'django', 'loadtest', '--serve',
+             '--database', options['database'], '--port', str(port), '--stats-file', stats_file],
+            env=dict(os.environ), cwd=str(settings.BASE_DIR)
+        )
+        try:
+            wait_for_port('127.0.0.1', port, server)
+            self.stdout.write(
+                f"Driving {options['concurrency']} planners for {options['duration']:.0f}s against port {port}"
+            )
+            results = asyncio.run(run_traffic(
+                '127.0.0.1', port, options['concurrency'], options['duration'], options['warmup'],
+                mix, knapsack_sizes, options['seed']
+            ))
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+
+        results['sqlite'] = None
+        if Path(stats_file).exists():
+            results['sqlite'] = json.loads(Path(stats_file).read_text())
+            Path(stats_file).unlink()
+        results['config'] = {
+            'concurrency': options['concurrency'],
+            'duration': options['duration'],
+            'workers': options['workers'],
+            'lines': options['lines'],
+            'days': options['days'],
+            'knapsack_sizes': knapsack_sizes,
+            'mix': mix,
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+        }
+
+        self.report(results)
+        if options['compare']:
+            self.compare(results, json.loads(Path(options['compare']).read_text()))
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(results, indent=2))
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def serve(self, options):
+        """
+        Threaded WSGI server that counts SQLite lock errors and time spent in writes.
+        """
+        from django.core.servers.basehttp import WSGIServer, run
+        from django.core.wsgi import get_wsgi_application
+
+        lock_stats = {'locked_errors': 0, 'write_statements': 0, 'write_time_s': 0.0, 'max_write_ms': 0.0}
+        stats_lock = threading.Lock()
+
+        def instrument(execute, sql, params, many, context):
+            is_write = not sql.lstrip().upper().startswith('SELECT')
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            except Exception as exc:
+                if 'database is locked' in str(exc):
+                    with stats_lock:
+                        lock_stats['locked_errors'] += 1
+                raise
+            finally:
+                if is_write:
+                    elapsed = time.perf_counter() - started
+                    with stats_lock:
+                        lock_stats['write_statements'] += 1
+                        lock_stats['write_time_s'] += elapsed
+                        lock_stats['max_write_ms'] = max(lock_stats['max_write_ms'], elapsed * 1000)
+
+        def on_connection_created(sender, connection, **kwargs):
+            connection.execute_wrappers.append(instrument)
+
+        connection_created.connect(on_connection_created, weak=False)
+
+        def stop(signum, frame):
+            raise SystemExit(0)
+
+        signal.signal(signal.SIGTERM, stop)
+        try:
+            application = get_wsgi_application()
+            # After get_wsgi_application(), which reconfigures logging
+            logging.getLogger('django.server').setLevel(logging.WARNING)
+            run('127.0.0.1', options['port'], application, threading=True, server_cls=WSGIServer)
+        finally:
+            if options['stats_file']:
+                Path(options['stats_file']).write_text(json.dumps(lock_stats))
+
+    def report(self, results):
+        self.stdout.write('')
+        self.stdout.write(f"{'endpoint':<18}{'reqs':>8}{'err%':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+        for name, row in sorted(results['endpoints'].items()) + [('TOTAL', results['total'])]:
+            self.stdout.write(
+                f"{name:<18}{row['requests']:>8}{row['error_rate'] * 100:>7.1f}%{row['throughput']:>9.1f}"
+                f"{fmt_ms(row['p50_ms'])}{fmt_ms(row['p95_ms'])}{fmt_ms(row['p99_ms'])}"
+            )
+        sqlite = results.get('sqlite')
+        if sqlite:
+            self.stdout.write(
+                f"SQLite: {sqlite['locked_errors']} 'database is locked' errors, "
+                f"{sqlite['write_statements']} writes, {sqlite['write_time_s']:.3f}s in writes, "
+                f"slowest write {sqlite['max_write_ms']:.1f} ms"
+            )
+        if results['status_codes']:
+            self.stdout.write(f"Status codes: {results['status_codes']}")
+
+    def compare(self, current, previous):
+        self.stdout.write('')
+        self.stdout.write('Change against the earlier run (p95 ms, req/s):')
+        for name, row in sorted(current['endpoints'].items()) + [('TOTAL', current['total'])]:
+            before = previous['total'] if name == 'TOTAL' else previous.get('endpoints', {}).get(name)
+            if not before:
+                continue
+            self.stdout.write(
+                f"{name:<18} p95 {fmt_delta(before['p95_ms'], row['p95_ms'])}   "
+                f"throughput {fmt_delta(before['throughput'], row['throughput'])}"
+            )
+
+def fmt_ms(value):
+    return f"{value:>9.1f}" if value is not None else f"{'-':>9}"
+
+def fmt_delta(before, after):
+    if before is None or after is None:
+        return 'n/a'
+    change = (after - before) / before * 100 if before else 0.0
+    return f"{before:.1f} -> {after:.1f} ({change:+.1f}%)"
+
+def use_database(path):
+    """
+    Point the default connection at the load-test database before it is first used.
+    """
+    connections['default'].close()
+    connections['default'].settings_dict['NAME'] = path
+
+def seed_database(path, n_workers, n_lines, n_days, seed):
+    from workforce.models import Worker, Shift, ProductionLine
+    from workforce.views import assign_workers_to_shifts
+
+    if os.path.exists(path):
+        os.remove(path)
+    call_command('migrate', run_syncdb=True, verbosity=0)
+
+    rng = random.Random(seed)
+    Worker.objects.bulk_create([
+        Worker(
+            name=f"Worker {i}",
+            skill_level='skilled' if rng.random() < 0.35 else 'semi_skilled',
+            max_shifts_per_week=rng.choice([4, 5, 6]),
+        )
+        for i in range(n_workers)
+    ])
+    ProductionLine.objects.bulk_create([
+        ProductionLine(
+            name=f"Line {j + 1}",
+            min_workers_required=0,
+            optimal_workers=3,
+            max_workers=rng.choice([4, 5, 6]),
+            skilled_ratio_required=rng.choice([0.2, 0.25, 0.3]),
+            production_rate=round(rng.uniform(0.8, 2.0), 2),
+            priority=rng.randint(1, 5),
+        )
+        for j in range(n_lines)
+    ])
+    workers = list(Worker.objects.all())
+    logging.getLogger('workforce.views').setLevel(logging.WARNING)
+    for day in range(n_days):
+        for shift_type, _ in Shift.SHIFT_TYPES:
+            # At least one skilled worker per two semi-skilled ones, so that every
+            # seeded shift can be balanced across the lines' skilled ratios
+            semi_skilled = rng.randint(6, 16)
+            shift = Shift.objects.create(
+                date=date.today() + timedelta(days=day),
+                shift_type=shift_type,
+                required_skilled=rng.randint(math.ceil(semi_skilled / 2), math.ceil(semi_skilled / 2) + 4),
+                required_semi_skilled=semi_skilled,
+            )
+            assign_workers_to_shifts(shift, workers)
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def wait_for_port(host, port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise CommandError('Load-test server exited during startup')
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise CommandError(f'Load-test server did not start listening on port {port}')
+
+async def fetch_csrf_token(host, port):
+    status, headers, _ = await http_request(host, port, 'GET', '/production-lines/')
+    for name, value in headers:
+        if name.lower() == 'set-cookie' and value.startswith('csrftoken='):
+            return value.split(';', 1)[0].split('=', 1)[1]
+    raise CommandError(f'Could not obtain a CSRF token (GET /production-lines/ returned {status})')
+
+def build_request(kind, rng, token, knapsack_sizes):
+    """
+    (label, method, path, body, headers) for one request of the given kind.
+    """
+    cookie = {'Cookie': f'csrftoken={token}'}
+    if kind == 'dashboard':
+        return kind, 'GET', '/', b'', {}
+    if kind == 'production_lines':
+        return kind, 'GET', '/production-lines/', b'', {}
+    if kind == 'optimize':
+        form = dict(OPTIMIZATION_FORM, csrfmiddlewaretoken=token, budget=rng.randint(4000, 9000))
+        headers = dict(cookie, **{'Content-Type': 'application/x-www-form-urlencoded'})
+        return kind, 'POST', '/', urlencode(form).encode(), headers
+    size = rng.choice(knapsack_sizes)
+    payload = {
+        'values': [rng.randint(1, 100) for _ in range(size)],
+        'weights': [rng.randint(1, 50) for _ in range(size)],
+        'capacity': size * 10,
+    }
+    headers = dict(cookie, **{'Content-Type': 'application/json', 'X-CSRFToken': token})
+    return f"knapsack_{size}", 'POST', '/knapsack/', json.dumps(payload).encode(), headers
+
+async def run_traffic(host, port, concurrency, duration, warmup, mix, knapsack_sizes, seed):
+    token = await fetch_csrf_token(host, port)
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    samples = {}
+    status_codes = {}
+    started = time.perf_counter()
+    measure_from = started + warmup
+    stop_at = measure_from + duration
+
+    async def planner(index):
+        rng = random.Random(seed * 1000 + index)
+        while time.perf_counter() < stop_at:
+            label, method, path, body, headers = build_request(
+                rng.choices(kinds, weights)[0], rng, token, knapsack_sizes
+            )
+            sent = time.perf_counter()
+            try:
+                status, _, _ = await http_request(host, port, method, path, body, headers)
+                ok = status < 400
+            except (OSError, asyncio.IncompleteReadError, ValueError, IndexError):
+                status, ok = 'connection_error', False
+            if sent >= measure_from:
+                samples.setdefault(label, []).append((time.perf_counter() - sent, ok))
+                status_codes[str(status)] = status_codes.get(str(status), 0) + 1
+
+    await asyncio.gather(*(planner(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - measure_from
+
+    all_samples = [sample for rows in samples.values() for sample in rows]
+    return {
+        'endpoints': {label: summarize(rows, elapsed) for label, rows in samples.items()},
+        'total': summarize(all_samples, elapsed),
+        'status_codes': status_codes,
+    }
@@ -0,0 +1,199 @@
+import json
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from workforce.capture import load_capture
+from workforce.knapsack import solve_knapsack
+from workforce.line_balancing import balance_workers
+from workforce.optimization import PARAMETER_FIELDS, can_vectorize, solve_workforce_optimization_vectorized
+from workforce.solver import get_budget
+
+KINDS = ['line_balancing', 'knapsack', 'workforce_optimization']
+
+class Command(BaseCommand):
+    help = (
+        'Re-run captured solves (see SOLVE_CAPTURE_DIR) against the current code, '
+        'a chosen engine and solver backend, and report timing and objective differences'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='Capture files or directories of captures')
+        parser.add_argument('--kind', choices=KINDS, action='append', help='Only replay these kinds')
+        parser.add_argument('--engine', default=None,
+                            help="line_balancing: auto, heuristic or milp; workforce_optimization: scalar or vectorized")
+        parser.add_argument('--solver', default=None, help='PuLP solver name, e.g. PULP_CBC_CMD or HiGHS_CMD')
+        parser.add_argument('--time-limit', type=float, default=None, help='Override the solver time budget')
+        parser.add_argument('--gap-rel', type=float, default=None, help='Override the relative MIP gap budget')
+        parser.add_argument('--repeat', type=int, default=1, help='Runs per capture; the fastest is reported')
+        parser.add_argument('--output', default=None, help='Write per-capture results as JSON to this file')
+
+    def handle(self, *args, **options):
+        files = []
+        for path in map(Path, options['paths']):
+            if path.is_dir():
+                files.extend(sorted(path.glob('*.npz')))
+            elif path.exists():
+                files.append(path)
+            else:
+                raise CommandError(f'No such capture file or directory: {path}')
+        if not files:
+            raise CommandError('No captures found')
+
+        overrides = {'SOLVE_CAPTURE_DIR': None}
+        if options['solver']:
+            overrides['SOLVER_NAME'] = options['solver']
+
+        rows = []
+        with override_settings(**overrides):
+            for path in files:
+                meta, arrays = load_capture(path)
+                if options['kind'] and meta['kind'] not in options['kind']:
+                    continue
+                replay = getattr(self, f"replay_{meta['kind']}")
+                best = None
+                for _ in range(max(options['repeat'], 1)):
+                    result = replay(meta, arrays, options)
+                    if best is None or result['solve_time'] < best['solve_time']:
+                        best = result
+                rows.append(self.compare(path, meta, best))
+
+        self.report(rows)
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(rows, indent=2))
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def budget(self, name, options):
+        budget = get_budget(name)
+        if options['time_limit'] is not None:
+            budget['time_limit'] = options['time_limit']
+        if options['gap_rel'] is not None:
+            budget['gap_rel'] = options['gap_rel']
+        return budget
+
+    def replay_line_balancing(self, meta, arrays, options):
+        lines = [
+            SimpleNamespace(
+                id=int(line_id), min_workers_required=int(min_workers), max_workers=int(max_workers),
+                skilled_ratio_required=float(ratio), production_rate=float(rate), priority=int(priority),
+            )
+            for line_id, min_workers, max_workers, ratio, rate, priority in zip(
+                arrays['line_ids'], arrays['line_min_workers'], arrays['line_max_workers'],
+                arrays['line_skilled_ratio'], arrays['line_production_rate'], arrays['line_priority'],
+            )
+        ]
+        workers = [
+            SimpleNamespace(id=int(worker_id), skill_level='skilled' if skilled else 'semi_skilled')
+            for worker_id, skilled in zip(arrays['worker_ids'], arrays['worker_skilled'])
+        ]
+        engine = options['engine'] or 'auto'
+        if engine not in ('auto', 'heuristic', 'milp'):
+            raise CommandError(f"Unknown line_balancing engine '{engine}'")
+        started = time.perf_counter()
+        assignment, solve_info = balance_workers(lines, workers, self.budget('line_balancing', options), engine)
+        return {
+            'solve_time': time.perf_counter() - started,
+            'status': solve_info['status'],
+            'objective': solve_info['objective'],
+            'engine': solve_info['engine'],
+            'size': f"{len(workers)} workers x {len(lines)} lines",
+        }
+
+    def replay_knapsack(self, meta, arrays, options):
+        values = arrays['values'].tolist()
+        weights = arrays['weights'].tolist()
+        started = time.perf_counter()
+        selected_items, total_value, total_weight, solve_info = solve_knapsack(
+            values, weights, float(arrays['capacity']), self.budget('knapsack', options)
+        )
+        return {
+            'solve_time': time.perf_counter() - started,
+            'status': solve_info['status'],
+            'objective': total_value,
+            'engine': 'milp',
+            'size': f"{len(values)} items",
+        }
+
+    def replay_workforce_optimization(self, meta, arrays, options):
+        from workforce.views import OptimizationView
+
+        fields = meta.get('parameter_fields', PARAMETER_FIELDS)
+        params_list = [SimpleNamespace(**dict(zip(fields, row))) for row in arrays['parameters'].tolist()]
+        engine = options['engine'] or 'vectorized'
+        if engine not in ('scalar', 'vectorized'):
+            raise CommandError(f"Unknown workforce_optimization engine '{engine}'")
+
+        started = time.perf_counter()
+        if engine == 'vectorized' and all(can_vectorize(params) for params in params_list):
+            solutions = solve_workforce_optimization_vectorized(params_list)
+        else:
+            view = OptimizationView()
+            solutions = [view.solve_workforce_optimization(params) for params in params_list]
+        solve_time = time.perf_counter() - started
+
+        captured = list(zip(arrays['skilled_workers'].tolist(), arrays['semi_skilled_workers'].tolist()))
+        replayed = [(s['skilled_workers'], s['semi_skilled_workers']) for s in solutions]
+        return {
+            'solve_time': solve_time,
+            'status': 'optimal',
+            'objective': sum(s['total_production'] for s in solutions),
+            'engine': engine,
+            'size': f"{len(params_list)} parameter sets",
+            'changed_solutions': sum(1 for a, b in zip(captured, replayed) if a != b),
+        }
+
+    def compare(self, path, meta, result):
+        captured_objective = meta.get('objective')
+        if meta['kind'] == 'workforce_optimization':
+            captured_objective = None
+        row = {
+            'file': path.name,
+            'kind': meta['kind'],
+            'size': result['size'],
+            'captured_status': meta.get('status', 'optimal'),
+            'captured_time': meta.get('solve_time'),
+            'captured_objective': captured_objective,
+            'replay_engine': result['engine'],
+            'replay_status': result['status'],
+            'replay_time': round(result['solve_time'], 6),
+            'replay_objective': result['objective'],
+            'objective_delta': None,
+        }
+        if captured_objective is not None and result['objective'] is not None:
+            delta = result['objective'] - captured_objective
+            row['objective_delta'] = 0.0 if abs(delta) < 1e-9 else delta
+        if 'changed_solutions' in result:
+            row['changed_solutions'] = result['changed_solutions']
+        return row
+
+    def report(self, rows):
+        self.stdout.write(
+            f"{'capture':<44}{'engine':>11}{'status':>22}{'time ms':>20}{'objective delta':>17}"
+        )
+        for row in rows:
+            captured_time = f"{row['captured_time'] * 1000:.1f}" if row['captured_time'] is not None else '-'
+            if row['objective_delta'] is not None:
+                delta = f"{row['objective_delta']:+.4g}"
+            elif 'changed_solutions' in row:
+                delta = f"{row['changed_solutions']} changed"
+            else:
+                delta = '-'
+            self.stdout.write(
+                f"{row['file'][:43]:<44}{row['replay_engine']:>11}"
+                f"{row['captured_status'] + ' -> ' + row['replay_status']:>22}"
+                f"{captured_time + ' -> ' + format(row['replay_time'] * 1000, '.1f'):>20}{delta:>17}"
+            )
+
+        regressions = [
+            row for row in rows
+            if row['objective_delta'] is not None and row['objective_delta'] < -1e-6
+        ]
+        changed = [row for row in rows if row.get('changed_solutions')]
+        total_captured = sum(row['captured_time'] or 0 for row in rows)
+        total_replay = sum(row['replay_time'] for row in rows)
+        self.stdout.write(
+            f"{len(rows)} captures replayed: {total_captured * 1000:.1f} ms captured, "
+            f"{total_replay * 1000:.1f} ms replayed, {len(regressions)} worse objectives, "
+            f"{len(changed)} changed workforce solutions"
+        )
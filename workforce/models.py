@@ -1,6 +1,15 @@
 from django.db import models
 
+class Site(models.Model):
+    name = models.CharField(max_length=100)
+    code = models.SlugField(max_length=50, unique=True)
+    
+    def __str__(self):
+        return f"{self.name} ({self.code})"
+
 class OptimizationParameters(models.Model):
+    # Null for the legacy global parameter set (id=1)
+    site = models.OneToOneField(Site, on_delete=models.CASCADE, null=True, blank=True, related_name='parameters')
     skilled_cost = models.FloatField(default=300)
     semi_skilled_cost = models.FloatField(default=150)
     skilled_production = models.FloatField(default=10)
@@ -11,6 +20,8 @@ class OptimizationParameters(models.Model):
     max_semi_skilled_workers = models.IntegerField(default=60)
     
     def __str__(self):
+        if self.site_id:
+            return f"Optimization Parameters for {self.site}"
         return f"Optimization Parameters (ID: {self.id})"
 
 class Worker(models.Model):
@@ -44,6 +55,50 @@ class Shift(models.Model):
     def __str__(self):
         return f"{self.date} - {self.shift_type}"
 
+class WorkerAbsence(models.Model):
+    """
+    A worker is unavailable from start_date to end_date inclusive, for every shift
+    or only for the given shift type (e.g. a sick day, or no nights this week).
+    """
+    worker = models.ForeignKey(Worker, on_delete=models.CASCADE, related_name='absences')
+    start_date = models.DateField()
+    end_date = models.DateField()
+    shift_type = models.CharField(max_length=20, choices=Shift.SHIFT_TYPES, blank=True)  # Blank means all shifts
+    reason = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [models.Index(fields=['start_date', 'end_date'])]
+    
+    def __str__(self):
+        slot = self.get_shift_type_display() if self.shift_type else 'all shifts'
+        return f"{self.worker} unavailable {self.start_date} to {self.end_date} ({slot})"
+
+class UnavailableSlot(models.Model):
+    """
+    A recurring slot a worker never works, e.g. Sunday nights.
+    """
+    WEEKDAYS = [
+        (0, 'Monday'),
+        (1, 'Tuesday'),
+        (2, 'Wednesday'),
+        (3, 'Thursday'),
+        (4, 'Friday'),
+        (5, 'Saturday'),
+        (6, 'Sunday'),
+    ]
+    
+    worker = models.ForeignKey(Worker, on_delete=models.CASCADE, related_name='unavailable_slots')
+    weekday = models.IntegerField(choices=WEEKDAYS)
+    shift_type = models.CharField(max_length=20, choices=Shift.SHIFT_TYPES, blank=True)  # Blank means all shifts
+    
+    class Meta:
+        unique_together = ['worker', 'weekday', 'shift_type']
+    
+    def __str__(self):
+        slot = self.get_shift_type_display() if self.shift_type else 'all shifts'
+        return f"{self.worker} unavailable on {self.get_weekday_display()} ({slot})"
+
 class ShiftAssignment(models.Model):
     worker = models.ForeignKey(Worker, on_delete=models.CASCADE)
     shift = models.ForeignKey(Shift, on_delete=models.CASCADE)
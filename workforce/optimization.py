@@ -0,0 +1,131 @@
+import math
+from .backends import get_backend
+
+# OptimizationParameters fields, in the column order used by the vectorized solver
+PARAMETER_FIELDS = [
+    'skilled_cost', 'semi_skilled_cost', 'skilled_production', 'semi_skilled_production',
+    'budget', 'min_production', 'max_skilled_workers', 'max_semi_skilled_workers',
+]
+
+def can_vectorize(params):
+    """
+    The vectorized solver covers parameter sets with finite, positive costs and
+    production rates. The scalar solver special-cases the others, so they are solved one by one.
+    """
+    values = [getattr(params, field) for field in PARAMETER_FIELDS]
+    if not all(math.isfinite(v) for v in values):
+        return False
+    return min(params.skilled_cost, params.semi_skilled_cost,
+               params.skilled_production, params.semi_skilled_production) > 0
+
+def solve_workforce_optimization_vectorized(params_list):
+    """
+    Solve the workforce optimization problem for many parameter sets at once.
+
+    Same corner-point method as OptimizationView.solve_workforce_optimization,
+    evaluated as (sites x corners) NumPy arrays. Every parameter set must pass can_vectorize.
+    Returns one solution dict per parameter set, in order.
+    """
+    np = get_backend('numpy')
+    if not params_list:
+        return []
+    p = np.array([[getattr(params, field) for field in PARAMETER_FIELDS] for params in params_list], dtype=float)
+    sc, uc, sp, up, budget, min_prod, max_x, max_y = p.T
+    zeros = np.zeros_like(sc)
+
+    # Corner points of the feasible region, one column per candidate
+    xs = np.stack([
+        zeros,
+        budget / sc,
+        zeros,
+        max_x,
+        (budget - uc * max_y) / sc,
+        min_prod / sp,
+        zeros,
+        max_x,
+        (min_prod - up * max_y) / sp,
+        max_x,
+    ], axis=1)
+    ys = np.stack([
+        zeros,
+        zeros,
+        budget / uc,
+        (budget - sc * max_x) / uc,
+        max_y,
+        zeros,
+        min_prod / up,
+        (min_prod - sp * max_x) / up,
+        max_y,
+        max_y,
+    ], axis=1)
+
+    # Filter valid corners that satisfy all constraints
+    valid = (
+        (xs >= 0) & (ys >= 0)
+        & (xs <= max_x[:, None]) & (ys <= max_y[:, None])
+        & (sc[:, None] * xs + uc[:, None] * ys <= budget[:, None])
+        & (sp[:, None] * xs + up[:, None] * ys >= min_prod[:, None])
+    )
+
+    # Corner with maximum production; the first one wins ties, and only
+    # strictly positive production replaces the origin
+    production = np.where(valid, sp[:, None] * xs + up[:, None] * ys, -np.inf)
+    best = np.argmax(production, axis=1)
+    rows = np.arange(len(params_list))
+    improves = production[rows, best] > 0
+    best_x = np.where(improves, xs[rows, best], 0.0)
+    best_y = np.where(improves, ys[rows, best], 0.0)
+
+    # Round to nearest integer (workforce must be whole numbers)
+    best_x = np.round(best_x)
+    best_y = np.round(best_y)
+
+    # Infeasible problems fall back to the maximum possible workforce
+    feasible = valid.any(axis=1)
+    best_x = np.where(feasible, best_x, max_x).astype(int)
+    best_y = np.where(feasible, best_y, max_y).astype(int)
+
+    actual_production = sp * best_x + up * best_y
+    actual_budget_used = sc * best_x + uc * best_y
+
+    # Convert once to Python scalars; indexing NumPy arrays per site is slow
+    return [
+        {
+            'skilled_workers': x,
+            'semi_skilled_workers': y,
+            'total_workers': x + y,
+            'total_production': production_value,
+            'budget_used': used,
+            'budget_remaining': remaining,
+        }
+        for x, y, production_value, used, remaining in zip(
+            best_x.tolist(), best_y.tolist(), actual_production.tolist(),
+            actual_budget_used.tolist(), (budget - actual_budget_used).tolist()
+        )
+    ]
+
+def solve_workforce_optimization_batch(params_list, solve_one):
+    """
+    Solve every parameter set, vectorized where possible and one by one otherwise.
+
+    Args:
+        params_list (list): OptimizationParameters instances
+        solve_one (callable): Scalar solver for the sets can_vectorize rejects
+
+    Returns:
+        list: One solution dict per parameter set, in order
+    """
+    solutions = [None] * len(params_list)
+    vectorized = []
+    scalar = []
+    for i, params in enumerate(params_list):
+        (vectorized if can_vectorize(params) else scalar).append(i)
+
+    for i, solution in zip(vectorized, solve_workforce_optimization_vectorized([params_list[i] for i in vectorized])):
+        solutions[i] = solution
+
+    # The scalar solver is pure Python and holds the GIL, so threads would not help
+    for i in scalar:
+        solutions[i] = solve_one(params_list[i])
+
+    return solutions
@@ -0,0 +1,209 @@
+import time
+from collections import defaultdict
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Q
+from .models import (
+    OptimizationParameters, Worker, ShiftAssignment, LineAssignment,
+    WorkerAbsence, UnavailableSlot
+)
+from .caching import invalidate_shift_rosters
+
+# Shift order used by the gap rule, as in check_shift_gap_rule
+SHIFT_ORDER = {'morning': 0, 'afternoon': 1, 'night': 2}
+
+# Skill levels that may fill a slot of each skill level, in order of preference
+SUBSTITUTES = {
+    'skilled': ['skilled'],
+    'semi_skilled': ['semi_skilled', 'skilled'],
+}
+
+def slot_index(date, shift_type):
+    """
+    Position of a shift on a single timeline; the gap rule forbids two
+    assignments less than 2 apart.
+    """
+    return date.toordinal() * 3 + SHIFT_ORDER[shift_type]
+
+def week_start(date):
+    return date - timedelta(days=date.weekday())
+
+def unavailable_worker_ids(shift):
+    """
+    Ids of the workers who are absent or have an unavailable slot for this shift.
+    """
+    slot = Q(shift_type='') | Q(shift_type=shift.shift_type)
+    ids = set(WorkerAbsence.objects.filter(
+        slot, start_date__lte=shift.date, end_date__gte=shift.date
+    ).values_list('worker_id', flat=True))
+    ids.update(UnavailableSlot.objects.filter(
+        slot, weekday=shift.date.weekday()
+    ).values_list('worker_id', flat=True))
+    return ids
+
+def replacement_costs():
+    """
+    Cost per skill level, from the default optimization parameters.
+    """
+    params = OptimizationParameters.objects.filter(id=1).first() or OptimizationParameters()
+    return {'skilled': params.skilled_cost, 'semi_skilled': params.semi_skilled_cost}
+
+class AvailabilityIndex:
+    """
+    Everything needed to decide who may work which shift between start and end,
+    loaded with one query per table and kept up to date as assignments change:
+    assigned slots per worker (gap rule), shifts per worker and week
+    (max_shifts_per_week), absences and unavailable slots, and workers by skill.
+    """
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+        self.workers = {worker.id: worker for worker in Worker.objects.all()}
+        self.by_skill = defaultdict(list)
+        for worker in sorted(self.workers.values(), key=lambda w: w.id):
+            self.by_skill[worker.skill_level].append(worker)
+
+        # Every assignment that can affect the weekly limit or the gap rule of a shift in range
+        first = min(week_start(start), start - timedelta(days=2))
+        last = max(week_start(end) + timedelta(days=6), end + timedelta(days=2))
+        self.slots = defaultdict(set)
+        self.weekly = defaultdict(int)
+        self.assignments = list(
+            ShiftAssignment.objects.filter(shift__date__range=(first, last)).select_related('shift')
+        )
+        for assignment in self.assignments:
+            self.add(assignment.worker_id, assignment.shift)
+
+        self.absences = defaultdict(list)
+        for worker_id, start_date, end_date, shift_type in WorkerAbsence.objects.filter(
+            start_date__lte=end, end_date__gte=start
+        ).values_list('worker_id', 'start_date', 'end_date', 'shift_type'):
+            self.absences[worker_id].append((start_date, end_date, shift_type))
+        self.unavailable_slots = set(
+            UnavailableSlot.objects.values_list('worker_id', 'weekday', 'shift_type')
+        )
+
+    def add(self, worker_id, shift):
+        self.slots[worker_id].add(slot_index(shift.date, shift.shift_type))
+        self.weekly[worker_id, week_start(shift.date)] += 1
+
+    def remove(self, worker_id, shift):
+        self.slots[worker_id].discard(slot_index(shift.date, shift.shift_type))
+        self.weekly[worker_id, week_start(shift.date)] -= 1
+
+    def is_available(self, worker_id, shift):
+        weekday = shift.date.weekday()
+        if (worker_id, weekday, '') in self.unavailable_slots:
+            return False
+        if (worker_id, weekday, shift.shift_type) in self.unavailable_slots:
+            return False
+        return not any(
+            start_date <= shift.date <= end_date and shift_type in ('', shift.shift_type)
+            for start_date, end_date, shift_type in self.absences.get(worker_id, ())
+        )
+
+    def is_eligible(self, worker, shift):
+        """
+        Whether the worker can take this shift on top of their current assignments.
+        """
+        if self.weekly[worker.id, week_start(shift.date)] >= worker.max_shifts_per_week:
+            return False
+        index = slot_index(shift.date, shift.shift_type)
+        slots = self.slots[worker.id]
+        if index in slots or index - 1 in slots or index + 1 in slots:
+            return False
+        return self.is_available(worker.id, shift)
+
+    def disrupted(self):
+        """
+        Assignments in range whose worker is no longer available, in shift order.
+        """
+        return sorted(
+            (
+                assignment for assignment in self.assignments
+                if self.start <= assignment.shift.date <= self.end
+                and not self.is_available(assignment.worker_id, assignment.shift)
+            ),
+            key=lambda a: (slot_index(a.shift.date, a.shift.shift_type), a.id)
+        )
+
+    def cheapest_replacement(self, absent, shift, costs):
+        """
+        The eligible worker with the lowest skill cost who can fill the absent
+        worker's slot; ties go to the lightest weekly load, then the lowest id.
+        """
+        best = None
+        best_key = None
+        week = week_start(shift.date)
+        for skill_level in SUBSTITUTES[absent.skill_level]:
+            for worker in self.by_skill[skill_level]:
+                key = (costs[skill_level], self.weekly[worker.id, week], worker.id)
+                if best_key is not None and key >= best_key:
+                    continue
+                if self.is_eligible(worker, shift):
+                    best, best_key = worker, key
+        return best
+
+def repair_assignments(start, end, costs=None):
+    """
+    Re-staff every assignment between start and end whose worker has become unavailable.
+
+    Each disrupted ShiftAssignment gets the cheapest eligible replacement of a suitable
+    skill (see AvailabilityIndex.cheapest_replacement), in shift order so that earlier
+    repairs count towards later weekly limits and gaps. The assignment row is updated
+    in place, so its LineAssignment keeps the replacement on the same production line.
+    Assignments nobody can fill are deleted together with their line assignment.
+
+    Returns:
+        tuple: (list of repair dicts, solve info with counts and timing)
+    """
+    started = time.perf_counter()
+    costs = costs or replacement_costs()
+    index = AvailabilityIndex(start, end)
+    disrupted = index.disrupted()
+
+    repairs = []
+    replaced = []
+    unfilled = []
+    for assignment in disrupted:
+        absent = index.workers[assignment.worker_id]
+        shift = assignment.shift
+        index.remove(absent.id, shift)
+        replacement = index.cheapest_replacement(absent, shift, costs)
+        if replacement is None:
+            unfilled.append(assignment)
+        else:
+            index.add(replacement.id, shift)
+            assignment.worker = replacement
+            replaced.append(assignment)
+        repairs.append({
+            'shift_assignment': assignment.id,
+            'shift': str(shift),
+            'absent_worker': absent.id,
+            'replacement': replacement.id if replacement else None,
+        })
+    search_time = time.perf_counter() - started
+
+    if disrupted:
+        lines = dict(LineAssignment.objects.filter(
+            shift_assignment__in=disrupted
+        ).values_list('shift_assignment_id', 'production_line__name'))
+        for repair in repairs:
+            repair['production_line'] = lines.get(repair['shift_assignment'])
+
+        with transaction.atomic():
+            if replaced:
+                ShiftAssignment.objects.bulk_update(replaced, ['worker'])
+            if unfilled:
+                ShiftAssignment.objects.filter(id__in=[a.id for a in unfilled]).delete()
+        # bulk_update sends no signals
+        invalidate_shift_rosters([assignment.shift_id for assignment in disrupted])
+
+    return repairs, {
+        'disrupted': len(disrupted),
+        'replaced': len(replaced),
+        'unfilled': len(unfilled),
+        'search_time': round(search_time, 6),
+        'solve_time': round(time.perf_counter() - started, 6),
+    }
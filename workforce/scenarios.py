@@ -0,0 +1,273 @@
+import math
+from django.conf import settings
+from .backends import get_backend
+
+OBJECTIVES = ['expected_shortfall', 'service_level']
+DISTRIBUTIONS = ['normal', 'poisson', 'uniform']
+
+# Longest horizon, in days, that shift staffing is planned over in one request
+MAX_HORIZON_DAYS = 366
+
+def scenario_limit():
+    return getattr(settings, 'WORKFORCE_SCENARIO_LIMIT', 10000)
+
+def scenario_value_limit():
+    return getattr(settings, 'WORKFORCE_SCENARIO_VALUE_LIMIT', 1000000)
+
+def _check_size(count, columns):
+    if count * columns > scenario_value_limit():
+        raise ValueError(
+            f'At most {scenario_value_limit() // max(columns, 1)} scenarios are accepted '
+            f'for {columns} demand columns.'
+        )
+
+def _check_totals(samples):
+    # Finite totals per column keep the running sums of shortfall_profile finite
+    np = get_backend('numpy')
+    with np.errstate(over='ignore', invalid='ignore'):
+        totals = samples.sum(axis=0)
+    if not np.isfinite(totals).all():
+        raise ValueError('Scenario demands must be finite, with a finite total per column.')
+    return samples
+
+def generate_scenarios(means, count, distribution='normal', cv=0.2, seed=None):
+    """
+    Sample count demand scenarios around the given means, one column per mean.
+
+    'normal' and 'uniform' have a standard deviation of cv * mean; 'poisson' uses
+    the mean as its variance and ignores cv. Negative samples are clipped to zero.
+
+    Returns:
+        ndarray: (count, len(means)) float array
+    """
+    np = get_backend('numpy')
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution '{distribution}'; use one of {', '.join(DISTRIBUTIONS)}.")
+    if not 0 < count <= scenario_limit():
+        raise ValueError(f'Scenario count must be between 1 and {scenario_limit()}.')
+    _check_size(count, len(means))
+    if not math.isfinite(cv) or cv < 0:
+        raise ValueError('cv must be finite and not negative.')
+
+    means = np.asarray(means, dtype=float)
+    rng = np.random.default_rng(seed)
+    shape = (count, len(means))
+    if distribution == 'normal':
+        samples = means * (1 + cv * rng.standard_normal(shape))
+    elif distribution == 'uniform':
+        # U(mean - a, mean + a) has standard deviation a / sqrt(3)
+        samples = means * (1 + cv * math.sqrt(3) * rng.uniform(-1, 1, shape))
+    else:
+        samples = rng.poisson(means, shape).astype(float)
+    return np.clip(samples, 0, None)
+
+def scenarios_from_request(data, means):
+    """
+    Demand scenarios from a request body: explicit samples under "scenarios"
+    (a list per mean, equally long), or a "distribution" spec such as
+    {"kind": "poisson", "count": 1000, "cv": 0.2, "seed": 7} centred on the means.
+    Raises ValueError with a message fit for the client.
+    """
+    np = get_backend('numpy')
+    samples = data.get('scenarios')
+    if samples is not None:
+        try:
+            samples = np.array(samples, dtype=float)
+        except (TypeError, ValueError):
+            raise ValueError('"scenarios" must hold equally long lists of numbers.')
+        if samples.ndim == 1:
+            samples = samples[None, :]
+        if samples.ndim != 2 or samples.shape[0] != len(means) or samples.shape[1] == 0:
+            raise ValueError(f'"scenarios" must hold {len(means)} equally long, non-empty lists of numbers.')
+        if samples.shape[1] > scenario_limit():
+            raise ValueError(f'At most {scenario_limit()} scenarios are accepted.')
+        _check_size(samples.shape[1], samples.shape[0])
+        if (samples < 0).any():
+            raise ValueError('Scenario demands must not be negative.')
+        return _check_totals(samples.T)
+
+    spec = data.get('distribution') or {}
+    if not isinstance(spec, dict):
+        raise ValueError('"distribution" must be an object.')
+    try:
+        count = int(spec.get('count', 1000))
+        cv = float(spec.get('cv', 0.2))
+        seed = spec.get('seed')
+        seed = None if seed is None else int(seed)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError('"distribution" count, cv and seed must be finite numbers.')
+    return _check_totals(generate_scenarios(means, count, spec.get('kind', 'normal'), cv, seed))
+
+def shortfall_profile(demand, levels):
+    """
+    Expected shortfall E[max(D - level, 0)] and service level P(D <= level) of
+    every level against one demand sample, from a single sort of the sample.
+    """
+    np = get_backend('numpy')
+    demand = np.sort(np.asarray(demand, dtype=float))
+    levels = np.asarray(levels, dtype=float)
+    n = len(demand)
+    # tail[i] is the total demand of the scenarios from i on
+    tail = np.concatenate([np.cumsum(demand[::-1])[::-1], [0.0]])
+    covered = np.searchsorted(demand, levels, side='right')
+    expected = (tail[covered] - levels * (n - covered)) / n
+    return np.maximum(expected, 0.0), covered / n
+
+def service_quantile(demand, service_level):
+    """
+    The smallest sampled demand that covers at least service_level of the scenarios.
+    Works on the first axis, so a (scenarios, columns) array gives one value per column.
+    """
+    np = get_backend('numpy')
+    if not 0 < service_level <= 1:
+        raise ValueError('service_level must be in (0, 1].')
+    demand = np.sort(np.asarray(demand, dtype=float), axis=0)
+    index = max(math.ceil(service_level * len(demand)) - 1, 0)
+    return demand[index]
+
+def solve_workforce_scenarios(params, demand, objective='expected_shortfall', service_level=0.95):
+    """
+    Staff against a sample of production demand instead of the single min_production.
+
+    'expected_shortfall' minimizes the expected unmet production within the budget and
+    worker limits, and spends no more than needed to reach that minimum.
+    'service_level' finds the cheapest staffing whose production covers the demand in
+    at least service_level of the scenarios; when the budget cannot reach it, the
+    minimum expected shortfall staffing is returned with 'target_met' False.
+    With no affordable staffing at all, nobody is staffed and 'target_met' is False.
+
+    Expected shortfall only depends on the production and never increases with it,
+    so each objective reduces to one production target: the service_level quantile
+    of the scenarios, or the largest demand capped at the largest affordable
+    production. For every skilled headcount at once, the fewest semi-skilled workers
+    reaching the target are computed and the cheapest combination is kept. Only that
+    staffing is then scored against all scenarios through shortfall_profile.
+
+    Args:
+        params: OptimizationParameters with positive costs and production rates
+        demand (array): Sampled production demand, one value per scenario
+
+    Returns:
+        dict: The solution fields of solve_workforce_optimization plus scenario statistics
+    """
+    np = get_backend('numpy')
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective '{objective}'; use one of {', '.join(OBJECTIVES)}.")
+    if min(params.skilled_cost, params.semi_skilled_cost,
+           params.skilled_production, params.semi_skilled_production) <= 0:
+        raise ValueError('Scenario mode needs positive costs and production rates.')
+    demand = np.asarray(demand, dtype=float)
+    sc, uc = params.skilled_cost, params.semi_skilled_cost
+    sp, up = params.skilled_production, params.semi_skilled_production
+
+    # For each skilled headcount, the most semi-skilled workers the budget allows
+    max_x = int(min(params.max_skilled_workers, params.budget // sc))
+    xs = np.arange(max_x + 1)
+    max_y = np.minimum(params.max_semi_skilled_workers, (params.budget - sc * xs) // uc)
+
+    def cheapest_reaching(target):
+        # Fewest semi-skilled workers per skilled headcount reaching the target
+        # production, then the cheapest of those that fit
+        ys = np.maximum(np.ceil((target - sp * xs) / up - 1e-9), 0)
+        fits = ys <= max_y
+        if not fits.any():
+            return None
+        cost = np.where(fits, sc * xs + uc * ys, np.inf)
+        best = int(np.argmin(cost))
+        return best, int(ys[best])
+
+    solution = None
+    if len(xs) and (max_y >= 0).all():
+        if objective == 'service_level':
+            solution = cheapest_reaching(service_quantile(demand, service_level))
+        if solution is None:
+            # The smallest expected shortfall is reached at the largest production,
+            # or at the largest demand when that can be covered
+            best_production = float((sp * xs + up * max_y).max())
+            solution = cheapest_reaching(min(best_production, float(demand.max())))
+    best_x, best_y = solution or (0, 0)
+
+    production = sp * best_x + up * best_y
+    used = sc * best_x + uc * best_y
+    expected, covered = shortfall_profile(demand, [production])
+    if objective == 'service_level':
+        target_met = bool(covered[0] >= service_level)
+    else:
+        target_met = solution is not None
+    return {
+        'skilled_workers': best_x,
+        'semi_skilled_workers': best_y,
+        'total_workers': best_x + best_y,
+        'total_production': production,
+        'budget_used': used,
+        'budget_remaining': params.budget - used,
+        'objective': objective,
+        'scenario_count': len(demand),
+        'expected_shortfall': float(expected[0]),
+        'service_level': float(covered[0]),
+        'target_met': target_met,
+    }
+
+def horizon_capacity(workers, start, days):
+    """
+    Shifts each skill can staff over the days from start: every worker's weekly
+    limit for each week touched, and at most every other shift slot under the gap rule.
+    Returns (capacity, headcount), both keyed by skill level.
+    """
+    weeks = (start.weekday() + days - 1) // 7 + 1
+    slots = math.ceil(3 * days / 2)
+    capacity = {'skilled': 0, 'semi_skilled': 0}
+    headcount = {'skilled': 0, 'semi_skilled': 0}
+    for worker in workers:
+        capacity[worker.skill_level] += min(worker.max_shifts_per_week * weeks, slots)
+        headcount[worker.skill_level] += 1
+    return capacity, headcount
+
+def plan_shift_staffing(demand, capacity, headcount, objective='expected_shortfall', service_level=0.95):
+    """
+    Staffing levels per shift and skill over a horizon of shifts.
+
+    'service_level' staffs every shift at its service_level demand quantile.
+    'expected_shortfall' shares each skill's shift capacity across the horizon to
+    minimize the total expected shortfall: the gain of the (s+1)-th worker on a shift
+    is P(D > s), which never increases with s, so taking the largest gains up to the
+    capacity is optimal. Levels never exceed the skill's headcount.
+
+    Args:
+        demand (ndarray): (scenarios, shifts, 2) skilled and semi-skilled demand
+        capacity (sequence): Shift slots available per skill over the horizon
+        headcount (sequence): Workers per skill
+
+    Returns:
+        tuple: (levels, expected shortfall, service level), each (shifts, 2)
+    """
+    np = get_backend('numpy')
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective '{objective}'; use one of {', '.join(OBJECTIVES)}.")
+    # Whole workers, kept as floats: huge sampled demands would overflow int64
+    demand = np.ceil(np.asarray(demand, dtype=float) - 1e-9)
+    n_scenarios, n_shifts, n_skills = demand.shape
+    headcount = np.asarray(headcount, dtype=np.int64)
+
+    if objective == 'service_level':
+        levels = np.minimum(service_quantile(demand, service_level), headcount).astype(np.int64)
+    else:
+        levels = np.zeros((n_shifts, n_skills), dtype=np.int64)
+        for skill in range(n_skills):
+            top = int(min(demand[:, :, skill].max(initial=0), headcount[skill]))
+            if top == 0 or capacity[skill] <= 0:
+                continue
+            # survivors[s, j]: scenarios of shift j whose demand exceeds s
+            clipped = np.minimum(demand[:, :, skill], top).astype(np.int64)
+            hist = np.zeros((top + 1, n_shifts), dtype=np.int64)
+            np.add.at(hist, (clipped, np.broadcast_to(np.arange(n_shifts), clipped.shape)), 1)
+            survivors = n_scenarios - np.cumsum(hist, axis=0)[:top]
+            gains = survivors.ravel()
+            order = np.argsort(-gains, kind='stable')[:int(capacity[skill])]
+            order = order[gains[order] > 0]
+            levels[:, skill] = np.bincount(order % n_shifts, minlength=n_shifts)
+
+    # Shortfall and service level of every shift against all scenarios at once
+    shortfall = np.maximum(demand - levels[None, :, :], 0).mean(axis=0)
+    covered = (demand <= levels[None, :, :]).mean(axis=0)
+    return levels, shortfall, covered
@@ -100,6 +100,60 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedStaticFilesStorage'
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Solver budgets per endpoint: wall-clock seconds and relative MIP gap.
+# The best incumbent found within the budget is returned with its status and gap.
+SOLVER_BUDGETS = {
+    'line_balancing': {'time_limit': 10, 'gap_rel': 0.0},
+    'line_balancing_stream': {'time_limit': 60, 'gap_rel': 0.0},
+    'knapsack': {'time_limit': 5, 'gap_rel': 0.0},
+    'knapsack_stream': {'time_limit': 30, 'gap_rel': 0.0},
+}
+
+# PuLP solver used for every MILP, by its pulp.listSolvers() name
+SOLVER_NAME = os.environ.get('SOLVER_NAME', 'PULP_CBC_CMD')
+
+# Opt-in capture of solve inputs and outputs as .npz files, replayable with
+# `manage.py replay_solves`. Unset to disable.
+SOLVE_CAPTURE_DIR = os.environ.get('SOLVE_CAPTURE_DIR')
+SOLVE_CAPTURE_SAMPLE_RATE = float(os.environ.get('SOLVE_CAPTURE_SAMPLE_RATE', '1.0'))
+
+# Solver backends imported by workforce.backends.prewarm(), e.g. from a post-fork hook.
+# Everything else is imported lazily on the first solve.
+SOLVER_PREWARM = ['pulp']
+
+# Most demand scenarios accepted or generated per scenario-mode request, and most
+# sampled values (scenarios x demand columns, e.g. two per shift in a horizon).
+WORKFORCE_SCENARIO_LIMIT = 10000
+WORKFORCE_SCENARIO_VALUE_LIMIT = 1000000
+
+# Upper bound for `manage.py check_import_time`, in milliseconds.
+IMPORT_TIME_BUDGET_MS = 1000
+
+# Production lines and shift rosters are cached in files shared by every worker
+# process when DJANGO_CACHE_DIR is set, or when gunicorn runs more than one worker
+# (WEB_CONCURRENCY). A single process uses its own memory.
+CACHE_DIR = os.environ.get('DJANGO_CACHE_DIR')
+if not CACHE_DIR and int(os.environ.get('WEB_CONCURRENCY', '1')) > 1:
+    CACHE_DIR = os.path.join(BASE_DIR, 'cache')
+if CACHE_DIR:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_DIR,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'workforce',
+        }
+    }
+
+# Backstop expiry, in seconds, for cached production lines and shift rosters.
+# Kept short for the per-process cache, which other processes cannot invalidate.
+WORKFORCE_CACHE_TIMEOUT = int(os.environ.get('WORKFORCE_CACHE_TIMEOUT', 3600 if CACHE_DIR else 10))
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True  # In production, replace with specific origins
 CORS_ALLOW_CREDENTIALS = True
@@ -0,0 +1,44 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import ProductionLine, Shift, ShiftAssignment, LineAssignment, Worker
+from .line_balancing import clear_compiled_models
+from .caching import invalidate_production_lines, invalidate_shift_rosters, invalidate_all_rosters
+
+@receiver([post_save, post_delete], sender=ProductionLine)
+def invalidate_compiled_line_models(sender, **kwargs):
+    """
+    Drop compiled line-balancing models whenever the production lines change.
+    """
+    clear_compiled_models()
+
+@receiver([post_save, post_delete], sender=ProductionLine)
+def invalidate_cached_production_lines(sender, **kwargs):
+    # Rosters show line names, so they go too
+    invalidate_production_lines()
+    invalidate_all_rosters()
+
+@receiver([post_save, post_delete], sender=Shift)
+def invalidate_shift_roster(sender, instance, **kwargs):
+    invalidate_shift_rosters([instance.id])
+
+# Assignments only invalidate on save: a post_delete receiver would turn off
+# Django's fast cascade delete for them. Cascades are covered by the Shift, Worker
+# and ProductionLine handlers; code deleting assignments directly invalidates itself.
+@receiver(post_save, sender=ShiftAssignment)
+def invalidate_shift_assignment_roster(sender, instance, **kwargs):
+    invalidate_shift_rosters([instance.shift_id])
+
+@receiver(post_save, sender=LineAssignment)
+def invalidate_line_assignment_roster(sender, instance, **kwargs):
+    if LineAssignment.shift_assignment.is_cached(instance):
+        shift_id = instance.shift_assignment.shift_id
+    else:
+        shift_id = ShiftAssignment.objects.filter(
+            id=instance.shift_assignment_id
+        ).values_list('shift_id', flat=True).first()
+    if shift_id is not None:
+        invalidate_shift_rosters([shift_id])
+
+@receiver([post_save, post_delete], sender=Worker)
+def invalidate_worker_rosters(sender, **kwargs):
+    invalidate_all_rosters()
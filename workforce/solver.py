@@ -0,0 +1,198 @@
+import contextlib
+import functools
+import json
+import time
+from django.conf import settings
+from .backends import get_backend
+
+# Fallback used for any endpoint missing from settings.SOLVER_BUDGETS
+DEFAULT_BUDGET = {'time_limit': 10, 'gap_rel': 0.0}
+
+# First time slice used when streaming incumbents; each later slice doubles
+FIRST_STREAM_SLICE = 0.25
+
+# PuLP solution statuses (pulp.LpSolution*), kept literal so PuLP is only imported to solve
+SOLUTION_STATUS = {
+    1: 'optimal',
+    2: 'feasible',
+    -1: 'infeasible',
+    -2: 'unbounded',
+}
+
+def get_budget(name):
+    """
+    Return the time and MIP-gap budget configured for an endpoint.
+    Budgets live in settings.SOLVER_BUDGETS, e.g. {'knapsack': {'time_limit': 5, 'gap_rel': 0.01}}.
+    """
+    budget = dict(DEFAULT_BUDGET)
+    budget.update(getattr(settings, 'SOLVER_BUDGETS', {}).get(name, {}))
+    return budget
+
+def make_solver(time_limit, gap_rel=0.0, warm_start=False, mip=True):
+    """
+    Instantiate the PuLP solver named by settings.SOLVER_NAME (CBC by default).
+    """
+    return get_backend('pulp').getSolver(
+        getattr(settings, 'SOLVER_NAME', 'PULP_CBC_CMD'),
+        msg=False,
+        mip=mip,
+        timeLimit=time_limit,
+        gapRel=gap_rel or None,
+        warmStart=warm_start,
+    )
+
+def has_incumbent(info):
+    return info['status'] in ('optimal', 'feasible')
+
+def relative_gap(objective, bound):
+    """
+    Relative gap between an incumbent objective and a bound on the optimum.
+    """
+    if objective is None or bound is None:
+        return None
+    return abs(bound - objective) / max(abs(bound), 1e-9)
+
+def relaxation_bound(prob, time_limit):
+    """
+    Bound the optimum of prob by solving its LP relaxation.
+    The incumbent values and status of prob are restored afterwards.
+    """
+    saved_values = {v.name: v.varValue for v in prob.variables()}
+    saved_status = (prob.status, prob.sol_status)
+    try:
+        prob.solve(make_solver(time_limit, mip=False))
+        bound = None
+        if SOLUTION_STATUS.get(prob.sol_status) == 'optimal':
+            bound = get_backend('pulp').value(prob.objective)
+    finally:
+        for v in prob.variables():
+            v.varValue = saved_values[v.name]
+        prob.status, prob.sol_status = saved_status
+    return bound
+
+def _solve_info(prob, budget, started, bound):
+    status = SOLUTION_STATUS.get(prob.sol_status, 'no_solution')
+    objective = None
+    gap = None
+    if status in ('optimal', 'feasible'):
+        objective = get_backend('pulp').value(prob.objective) or 0.0
+        if status == 'optimal' and not budget['gap_rel']:
+            gap = 0.0
+        else:
+            if callable(bound):
+                bound = bound()
+            gap = relative_gap(objective, bound)
+    return {
+        'status': status,
+        'objective': objective,
+        'gap': gap,
+        'solve_time': round(time.perf_counter() - started, 4),
+        'time_limit': budget['time_limit'],
+        'gap_rel': budget['gap_rel'],
+    }
+
+@contextlib.contextmanager
+def minimization_form(prob):
+    """
+    Temporarily turn a maximization problem into the minimization of its negated
+    objective. CBC reads a MIP start's objective with the wrong sign on maximization
+    problems and throws the start away, so warm starts are solved in this form.
+    """
+    if prob.sense != get_backend('pulp').LpMaximize:
+        yield prob
+        return
+    objective = prob.objective
+    prob.sense = get_backend('pulp').LpMinimize
+    prob.objective = -objective
+    try:
+        yield prob
+    finally:
+        prob.sense = get_backend('pulp').LpMaximize
+        prob.objective = objective
+
+def _solve(prob, solver, warm_start):
+    if not warm_start:
+        prob.solve(solver)
+        return
+    with minimization_form(prob):
+        prob.solve(solver)
+
+def solve_with_budget(prob, budget, bound=None, warm_start=False):
+    """
+    Solve prob within a time and MIP-gap budget and keep the best incumbent found.
+
+    Args:
+        prob (LpProblem): Problem to solve; variable values hold the incumbent afterwards
+        budget (dict): {'time_limit': seconds, 'gap_rel': relative MIP gap}
+        bound (float or callable): Bound on the optimum, used to report the gap of
+            incumbents that are not proven optimal. A callable is only evaluated then.
+        warm_start (bool): Start from the values already set on the variables
+
+    Returns:
+        dict: status ('optimal', 'feasible', 'infeasible', 'unbounded' or 'no_solution'),
+            objective, gap and solve_time
+    """
+    started = time.perf_counter()
+    _solve(prob, make_solver(budget['time_limit'], budget['gap_rel'], warm_start=warm_start), warm_start)
+    return _solve_info(prob, budget, started, bound)
+
+def iter_incumbents(prob, budget, bound=None):
+    """
+    Solve prob in doubling time slices, warm-starting each slice from the previous
+    incumbent, and yield solve info every time the incumbent improves.
+    Variable values of prob hold the yielded incumbent while the generator is paused.
+    The last item yielded is always the final result; it is only yielded again at the
+    end when it differs from the last incumbent, e.g. when optimality was proven.
+    """
+    started = time.perf_counter()
+    if callable(bound):
+        bound = functools.lru_cache(maxsize=None)(bound)
+    time_slice = FIRST_STREAM_SLICE
+    best = None
+    best_values = None
+    last_yielded = None
+    info = None
+    while True:
+        remaining = budget['time_limit'] - (time.perf_counter() - started)
+        if remaining <= 0:
+            break
+        _solve(prob, make_solver(
+            min(time_slice, remaining),
+            budget['gap_rel'],
+            warm_start=best is not None,
+        ), best is not None)
+        info = _solve_info(prob, budget, started, bound)
+        if info['status'] in ('infeasible', 'unbounded'):
+            break
+        # A proof of optimality replaces an incumbent of the same objective
+        if has_incumbent(info) and (
+            best is None or info['status'] == 'optimal'
+            or _improves(prob, info['objective'], best['objective'])
+        ):
+            best = info
+            best_values = {v.name: v.varValue for v in prob.variables()}
+            if info['status'] != 'optimal':
+                last_yielded = info
+                yield info
+        if info['status'] == 'optimal':
+            break
+        time_slice *= 2
+    
+    # A slice cut short by the time limit can come back worse than the warm start
+    if best is not None and info is not best:
+        for v in prob.variables():
+            v.varValue = best_values[v.name]
+        info = dict(best, solve_time=round(time.perf_counter() - started, 4))
+    if info is not None and (best is None or best is not last_yielded):
+        yield info
+
+def _improves(prob, objective, best):
+    if prob.sense > 0:
+        return objective < best - 1e-9
+    return objective > best + 1e-9
+
+def format_sse(event, data):
+    """
+    Encode one Server-Sent Events message.
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
@@ -3,6 +3,15 @@ from . import views
 
 urlpatterns = [
     path('', views.OptimizationView.as_view(), name='optimization'),
+    path('optimize/batch/', views.BatchOptimizationView.as_view(), name='batch_optimization'),
+    path('optimize/scenarios/', views.ScenarioOptimizationView.as_view(), name='scenario_optimization'),
+    path('shifts/scenarios/', views.ShiftScenarioView.as_view(), name='shift_scenarios'),
+    path('shifts/repair/', views.RepairView.as_view(), name='repair_shifts'),
+    path('absences/', views.AbsenceView.as_view(), name='absences'),
+    path('unavailable-slots/', views.UnavailableSlotView.as_view(), name='unavailable_slots'),
     path('production-lines/', views.ProductionLineView.as_view(), name='production_lines'),
     path('knapsack/', views.KnapsackView.as_view(), name='knapsack'),
+    path('knapsack/stream/', views.KnapsackStreamView.as_view(), name='knapsack_stream'),
+    path('solver/stats/', views.SolverStatsView.as_view(), name='solver_stats'),
+    path('shifts/<int:shift_id>/balance/stream/', views.LineBalancingStreamView.as_view(), name='line_balancing_stream'),
 ]
@@ -1,19 +1,31 @@
 from django.shortcuts import render, redirect
 from django.views import View
 from django.views.generic import TemplateView
-from django.db import OperationalError
+from django.db import OperationalError, transaction
 from django.db.models import Q, Count
 from datetime import datetime, timedelta
+from django.urls import reverse
+from urllib.parse import urlencode
 from .models import (
-    OptimizationParameters, OptimizationResult, Worker, 
-    Shift, ShiftAssignment, ProductionLine, LineAssignment
+    Site, OptimizationParameters, OptimizationResult, Worker, 
+    Shift, ShiftAssignment, ProductionLine, LineAssignment, WorkerAbsence, UnavailableSlot
 )
 from .forms import OptimizationForm, ProductionLineForm
-from .knapsack import solve_knapsack, format_solution
+from .knapsack import solve_knapsack, iter_knapsack_incumbents, format_solution
+from .optimization import solve_workforce_optimization_batch
+from .repair import unavailable_worker_ids, repair_assignments
+from .scenarios import MAX_HORIZON_DAYS, scenarios_from_request, solve_workforce_scenarios, horizon_capacity, plan_shift_staffing
+from .line_balancing import balance_workers, engine_stats, get_compiled_model, assign_by_skill_counts
+from .caching import get_production_lines, render_shift_rosters, invalidate_shift_rosters
+from .capture import capture_line_balancing, capture_workforce_optimization
+from .solver import get_budget, iter_incumbents, relaxation_bound, has_incumbent, format_sse
 import json
-import numpy as np
-from pulp import *
-from django.http import JsonResponse
+import logging
+import time
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse, StreamingHttpResponse, HttpResponseBadRequest
+
+logger = logging.getLogger(__name__)
 
 def check_shift_gap_rule(worker, shift):
     """
@@ -54,99 +66,61 @@ def check_shift_gap_rule(worker, shift):
     
     return True
 
+def build_line_assignments(shift_assignments, assignment):
+    """
+    Turn a {worker id: line} assignment into LineAssignment objects.
+    """
+    return [
+        LineAssignment(
+            shift_assignment=shift_assignments[worker_id],
+            production_line=line
+        )
+        for worker_id, line in assignment.items()
+    ]
+
 def balance_production_lines(shift, assigned_workers):
     """
     Optimize the assignment of workers to production lines for a given shift.
-    Uses linear programming to maximize production while respecting line constraints.
+    A greedy heuristic with local search runs first and is accepted when it reaches
+    its upper bound; otherwise the exact MILP is solved within the 'line_balancing'
+    budget, warm-started from the heuristic, and its best incumbent is kept even
+    when optimality was not proven in time. The MILP is compiled once per
+    production-line configuration and reused across shifts.
+    Returns the line assignments and the solve info (engine, status, gap, solve time).
     """
-    # Get all production lines
-    production_lines = ProductionLine.objects.all().order_by('-priority')
+    # Get all production lines; solves read them from the database, never the display cache
+    production_lines = list(ProductionLine.objects.all().order_by('-priority', 'id'))
+    assigned_workers = list(assigned_workers)
     
     # If no production lines exist, return empty assignments
-    if not production_lines.exists():
-        return []
-    
-    # Create optimization problem
-    prob = LpProblem("ProductionLineBalancing", LpMaximize)
-    
-    # Create variables for worker assignments to lines
-    assignments = {}
-    for worker in assigned_workers:
-        for line in production_lines:
-            assignments[(worker.id, line.id)] = LpVariable(
-                f"worker_{worker.id}_line_{line.id}",
-                0, 1, LpBinary
-            )
+    if not production_lines:
+        return [], None
+    
+    shift_assignments = {
+        sa.worker_id: sa
+        for sa in ShiftAssignment.objects.filter(shift=shift)
+    }
     
-    # Objective: Maximize weighted production across all lines
-    prob += lpSum([
-        assignments[(w.id, l.id)] * l.production_rate * l.priority
-        for w in assigned_workers
-        for l in production_lines
-    ])
-    
-    # Constraint 1: Each worker can only be assigned to one line
-    for worker in assigned_workers:
-        prob += lpSum([
-            assignments[(worker.id, line.id)]
-            for line in production_lines
-        ]) == 1
-    
-    # Constraint 2: Minimum and maximum workers per line
-    for line in production_lines:
-        worker_count = lpSum([
-            assignments[(w.id, line.id)]
-            for w in assigned_workers
-        ])
-        prob += worker_count >= line.min_workers_required
-        prob += worker_count <= line.max_workers
-    
-    # Constraint 3: Skilled worker ratio requirement
-    for line in production_lines:
-        skilled_workers = lpSum([
-            assignments[(w.id, line.id)]
-            for w in assigned_workers
-            if w.skill_level == 'skilled'
-        ])
-        total_workers = lpSum([
-            assignments[(w.id, line.id)]
-            for w in assigned_workers
-        ])
-        prob += skilled_workers >= line.skilled_ratio_required * total_workers
-    
-    # Solve the problem
-    prob.solve()
-    
-    # Create assignments based on solution
-    line_assignments = []
-    if LpStatus[prob.status] == 'Optimal':
-        for worker in assigned_workers:
-            for line in production_lines:
-                if value(assignments[(worker.id, line.id)]) == 1:
-                    # Get the shift assignment for this worker
-                    shift_assignment = ShiftAssignment.objects.get(
-                        worker=worker,
-                        shift=shift
-                    )
-                    # Create line assignment
-                    line_assignments.append(
-                        LineAssignment(
-                            shift_assignment=shift_assignment,
-                            production_line=line
-                        )
-                    )
-    
-    return line_assignments
+    assignment, solve_info = balance_workers(
+        production_lines, assigned_workers, get_budget('line_balancing')
+    )
+    capture_line_balancing(production_lines, assigned_workers, assignment, solve_info)
+    
+    return build_line_assignments(shift_assignments, assignment), solve_info
 
 def assign_workers_to_shifts(shift, available_workers):
     """
-    Assign workers to a shift while respecting the 2-shift gap rule and then
-    balance them across production lines.
+    Assign available workers to a shift while respecting the 2-shift gap rule and
+    then balance them across production lines.
     """
     assignments = []
     skilled_needed = shift.required_skilled
     semi_skilled_needed = shift.required_semi_skilled
     
+    # Leave out absent workers and those with an unavailable slot
+    unavailable = unavailable_worker_ids(shift)
+    available_workers = [w for w in available_workers if w.id not in unavailable]
+    
     # Sort workers by number of assigned shifts (to balance workload)
     available_workers = sorted(
         available_workers,
@@ -191,57 +165,73 @@ def assign_workers_to_shifts(shift, available_workers):
         )
         
         # Balance workers across production lines
-        line_assignments = balance_production_lines(shift, assigned_workers)
+        line_assignments, solve_info = balance_production_lines(shift, assigned_workers)
+        if solve_info:
+            logger.info("Line balancing for %s: %s", shift, solve_info)
         
         # Save line assignments
         if line_assignments:
             LineAssignment.objects.bulk_create(line_assignments)
+        
+        # Bulk writes send no signals
+        invalidate_shift_rosters([shift.id])
     
     return len(assignments)
 
+def get_site_parameters(site_code, create=False):
+    """
+    Return the parameter set for a site, or the global default set (id=1) when no
+    site is given. Unknown sites are only created when create is True, after the
+    code is validated as a slug; otherwise an unsaved default parameter set is returned.
+    """
+    if not site_code:
+        params, created = OptimizationParameters.objects.get_or_create(id=1)
+        return params
+    
+    if create:
+        # Raises ValidationError unless the code is a valid slug
+        site_code = Site._meta.get_field('code').clean(site_code, None)
+        site, created = Site.objects.get_or_create(code=site_code, defaults={'name': site_code})
+        params, created = OptimizationParameters.objects.get_or_create(site=site)
+        return params
+    
+    params = OptimizationParameters.objects.filter(site__code=site_code).first()
+    return params or OptimizationParameters()
+
 class OptimizationView(TemplateView):
     template_name = 'workforce/index.html'
     
     def get(self, request):
         try:
-            # Get or create default parameters
-            params, created = OptimizationParameters.objects.get_or_create(id=1)
+            # Get the parameters of the requested site, or the default parameters
+            site_code = request.GET.get('site')
+            params = get_site_parameters(site_code)
             form = OptimizationForm(instance=params)
             
             # Get the latest result if it exists
-            latest_result = OptimizationResult.objects.filter(parameters=params).last()
+            latest_result = None
+            if params.pk:
+                latest_result = OptimizationResult.objects.filter(parameters=params).last()
             
-            # Get upcoming shifts and their assignments
-            upcoming_shifts = Shift.objects.filter(
+            # Get upcoming shifts and their cached roster fragments
+            upcoming_shifts = list(Shift.objects.filter(
                 date__gte=datetime.now().date()
-            ).order_by('date', 'shift_type')
-            
-            # Get shift assignments and line assignments
-            shift_data = {}
-            for shift in upcoming_shifts:
-                assignments = ShiftAssignment.objects.filter(shift=shift).select_related('worker')
-                line_assignments = LineAssignment.objects.filter(
-                    shift_assignment__shift=shift
-                ).select_related('production_line', 'shift_assignment__worker')
-                
-                shift_data[shift.id] = {
-                    'assignments': assignments,
-                    'line_assignments': line_assignments
-                }
+            ).order_by('date', 'shift_type'))
+            shift_rosters = render_shift_rosters(upcoming_shifts)
             
             # Get production lines
-            production_lines = ProductionLine.objects.all().order_by('-priority')
+            production_lines = get_production_lines()
             
             # Get stats for dashboard
             total_workers = Worker.objects.count()
-            active_shifts = Shift.objects.filter(date__gte=datetime.now().date()).count()
-            total_production_lines = production_lines.count()
+            active_shifts = len(upcoming_shifts)
+            total_production_lines = len(production_lines)
             
             context = {
                 'form': form,
                 'result': latest_result,
                 'upcoming_shifts': upcoming_shifts,
-                'shift_data': shift_data,
+                'shift_rosters': shift_rosters,
                 'production_lines': production_lines,
                 'total_workers': total_workers,
                 'active_shifts': active_shifts,
@@ -255,8 +245,12 @@ class OptimizationView(TemplateView):
     
     def post(self, request):
         try:
-            # Get or create default parameters
-            params, created = OptimizationParameters.objects.get_or_create(id=1)
+            # Get or create the parameters of the requested site
+            site_code = request.GET.get('site')
+            try:
+                params = get_site_parameters(site_code, create=True)
+            except ValidationError:
+                return HttpResponseBadRequest('Invalid site code.')
             
             # Update parameters with form data
             form = OptimizationForm(request.POST, instance=params)
@@ -264,7 +258,9 @@ class OptimizationView(TemplateView):
                 params = form.save()
                 
                 # Solve the optimization problem
+                started = time.perf_counter()
                 solution = self.solve_workforce_optimization(params)
+                capture_workforce_optimization([params], [solution], time.perf_counter() - started, 'scalar')
                 
                 # Create a new result object
                 OptimizationResult.objects.create(
@@ -275,7 +271,9 @@ class OptimizationView(TemplateView):
                     budget_used=solution['budget_used'],
                 )
                 
-                return redirect('optimize')
+                if site_code:
+                    return redirect(f"{reverse('optimization')}?{urlencode({'site': site_code})}")
+                return redirect('optimization')
             
             context = {
                 'form': form,
@@ -456,11 +454,390 @@ class OptimizationView(TemplateView):
             'production': production
         }
 
+class BatchOptimizationView(View):
+    """
+    Re-plan every site in one call.
+    
+    The optional JSON body {"sites": {"<code>": {"budget": 7000, ...}}} updates the
+    listed sites' parameters and restricts the run to them; without it every site
+    with a parameter set is solved. Results are stored with a single bulk insert.
+    """
+    
+    def post(self, request):
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return JsonResponse({'error': 'Invalid JSON body.'}, status=400)
+        if not isinstance(data, dict):
+            return JsonResponse({'error': 'The JSON body must be an object.'}, status=400)
+        updates = data.get('sites') or {}
+        if not isinstance(updates, dict) or not all(isinstance(o, dict) for o in updates.values()):
+            return JsonResponse({'error': '"sites" must map site codes to parameter overrides.'}, status=400)
+        
+        params_qs = OptimizationParameters.objects.filter(site__isnull=False).select_related('site')
+        if updates:
+            params_qs = params_qs.filter(site__code__in=list(updates))
+        params_list = list(params_qs.order_by('site__code'))
+        
+        missing = set(updates) - {params.site.code for params in params_list}
+        if missing:
+            return JsonResponse({'error': f"Unknown sites: {', '.join(sorted(missing))}"}, status=404)
+        
+        # Validate every override before saving any of them
+        errors = {}
+        for params in params_list:
+            overrides = updates.get(params.site.code)
+            if not overrides:
+                continue
+            current = {name: getattr(params, name) for name in OptimizationForm.base_fields}
+            form = OptimizationForm(dict(current, **overrides), instance=params)
+            if form.is_valid():
+                form.save(commit=False)
+            else:
+                errors[params.site.code] = form.errors
+        if errors:
+            return JsonResponse({'error': 'Invalid parameters.', 'sites': errors}, status=400)
+        
+        started = time.perf_counter()
+        solutions = solve_workforce_optimization_batch(
+            params_list, OptimizationView().solve_workforce_optimization
+        )
+        capture_workforce_optimization(params_list, solutions, time.perf_counter() - started, 'batch')
+        
+        with transaction.atomic():
+            if updates:
+                OptimizationParameters.objects.bulk_update(
+                    [params for params in params_list if updates.get(params.site.code)],
+                    list(OptimizationForm.base_fields)
+                )
+            OptimizationResult.objects.bulk_create([
+                OptimizationResult(
+                    parameters=params,
+                    skilled_workers=solution['skilled_workers'],
+                    semi_skilled_workers=solution['semi_skilled_workers'],
+                    total_production=solution['total_production'],
+                    budget_used=solution['budget_used'],
+                )
+                for params, solution in zip(params_list, solutions)
+            ])
+        
+        return JsonResponse({
+            'sites': {
+                params.site.code: solution
+                for params, solution in zip(params_list, solutions)
+            }
+        })
+
+def scenario_options(data):
+    """
+    The objective and service level of a scenario request body.
+    """
+    objective = data.get('objective', 'expected_shortfall')
+    try:
+        service_level = float(data.get('service_level', 0.95))
+    except (TypeError, ValueError):
+        raise ValueError('service_level must be a number.')
+    return objective, service_level
+
+class ScenarioOptimizationView(View):
+    """
+    Solve a site's workforce optimization against sampled production demand.
+    
+    The JSON body gives the demand as {"scenarios": [120, 95, ...]} or as
+    {"distribution": {"kind": "normal", "count": 1000, "cv": 0.2, "seed": 7}} around
+    min_production, and {"objective": "expected_shortfall"} or
+    {"objective": "service_level", "service_level": 0.95}. ?site= selects the site.
+    """
+    
+    def post(self, request):
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return JsonResponse({'error': 'Invalid JSON body.'}, status=400)
+        if not isinstance(data, dict):
+            return JsonResponse({'error': 'The JSON body must be an object.'}, status=400)
+        
+        site_code = request.GET.get('site')
+        params = get_site_parameters(site_code)
+        if site_code and params.pk is None:
+            return JsonResponse({'error': f'Unknown site: {site_code}'}, status=404)
+        try:
+            objective, service_level = scenario_options(data)
+            demand = scenarios_from_request(data, [params.min_production])[:, 0]
+            solution = solve_workforce_scenarios(params, demand, objective, service_level)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        
+        return JsonResponse(solution)
+
+class ShiftScenarioView(View):
+    """
+    Plan the skilled and semi-skilled staffing of every shift in a horizon against
+    sampled demand, sharing the workforce's shift capacity between the shifts.
+    
+    The JSON body gives the horizon as {"start": "2026-10-20", "days": 7} (default: the
+    next 7 days), the demand per shift as {"scenarios": {"<shift id>": {"skilled": [...],
+    "semi_skilled": [...]}}} for every shift in the horizon, or as a "distribution" around
+    the shifts' current requirements, and the objective as for ScenarioOptimizationView.
+    With {"apply": true} the planned levels become the shifts' requirements.
+    """
+    
+    def post(self, request):
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return JsonResponse({'error': 'Invalid JSON body.'}, status=400)
+        if not isinstance(data, dict):
+            return JsonResponse({'error': 'The JSON body must be an object.'}, status=400)
+        
+        try:
+            start = datetime.strptime(data['start'], '%Y-%m-%d').date() if data.get('start') else datetime.now().date()
+            days = int(data.get('days', 7))
+        except (TypeError, ValueError, OverflowError):
+            return JsonResponse({'error': 'start must be YYYY-MM-DD and days a number.'}, status=400)
+        if not 1 <= days <= MAX_HORIZON_DAYS:
+            return JsonResponse({'error': f'days must be between 1 and {MAX_HORIZON_DAYS}.'}, status=400)
+        try:
+            end = start + timedelta(days=days - 1)
+        except OverflowError:
+            return JsonResponse({'error': 'The horizon ends after the last supported date.'}, status=400)
+        
+        shifts = list(Shift.objects.filter(
+            date__range=(start, end)
+        ).order_by('date', 'shift_type'))
+        if not shifts:
+            return JsonResponse({'error': 'No shifts in this horizon.'}, status=404)
+        
+        means = [value for shift in shifts for value in (shift.required_skilled, shift.required_semi_skilled)]
+        samples = data.get('scenarios')
+        try:
+            objective, service_level = scenario_options(data)
+            if samples is not None:
+                if not isinstance(samples, dict):
+                    raise ValueError('"scenarios" must map shift ids to skilled and semi_skilled samples.')
+                missing = [shift.id for shift in shifts if str(shift.id) not in samples]
+                if missing:
+                    raise ValueError(f"No scenarios for shifts {', '.join(map(str, missing))}.")
+                samples = {'scenarios': [
+                    samples[str(shift.id)].get(skill_level, [])
+                    for shift in shifts for skill_level in ('skilled', 'semi_skilled')
+                ]}
+            demand = scenarios_from_request(samples or data, means)
+            capacity, headcount = horizon_capacity(Worker.objects.all(), start, days)
+            levels, shortfall, covered = plan_shift_staffing(
+                demand.reshape(len(demand), len(shifts), 2),
+                [capacity['skilled'], capacity['semi_skilled']],
+                [headcount['skilled'], headcount['semi_skilled']],
+                objective, service_level
+            )
+        except (AttributeError, ValueError) as e:
+            message = str(e) if isinstance(e, ValueError) else 'Shift scenarios must be objects.'
+            return JsonResponse({'error': message}, status=400)
+        
+        levels = levels.tolist()
+        if data.get('apply'):
+            for shift, (skilled, semi_skilled) in zip(shifts, levels):
+                shift.required_skilled = skilled
+                shift.required_semi_skilled = semi_skilled
+            Shift.objects.bulk_update(shifts, ['required_skilled', 'required_semi_skilled'])
+            invalidate_shift_rosters([shift.id for shift in shifts])
+        
+        return JsonResponse({
+            'objective': objective,
+            'scenario_count': len(demand),
+            'capacity': capacity,
+            'applied': bool(data.get('apply')),
+            'shifts': [
+                {
+                    'id': shift.id,
+                    'date': shift.date.isoformat(),
+                    'shift_type': shift.shift_type,
+                    'skilled': skilled,
+                    'semi_skilled': semi_skilled,
+                    'expected_shortfall': {'skilled': short[0], 'semi_skilled': short[1]},
+                    'service_level': {'skilled': cov[0], 'semi_skilled': cov[1]},
+                }
+                for shift, (skilled, semi_skilled), short, cov in zip(
+                    shifts, levels, shortfall.tolist(), covered.tolist()
+                )
+            ],
+        })
+
+def parse_date(value, name):
+    try:
+        parsed = datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ValueError(f'{name} must be a YYYY-MM-DD date.')
+    # Repairs look a week either side, which must stay within the representable dates
+    if not 1 < parsed.year < 9999:
+        raise ValueError(f'{name} is out of range.')
+    return parsed
+
+def parse_shift_type(value):
+    """
+    A shift type from a request body; empty means every shift.
+    """
+    if not value:
+        return ''
+    if value not in [choice for choice, label in Shift.SHIFT_TYPES]:
+        raise ValueError(f"Unknown shift type '{value}'.")
+    return value
+
+def unknown_workers_response(worker_ids):
+    """
+    A 404 response naming the ids that are not workers, or None if all are.
+    """
+    ids = [i for i in worker_ids if isinstance(i, int) and not isinstance(i, bool)]
+    unknown = set(worker_ids) - set(Worker.objects.filter(id__in=ids).values_list('id', flat=True))
+    if not unknown:
+        return None
+    return JsonResponse({'error': f"Unknown workers: {', '.join(sorted(map(str, unknown)))}"}, status=404)
+
+class AbsenceView(View):
+    """
+    Record worker absences and repair the affected shift assignments.
+    
+    The JSON body is {"absences": [{"worker": 3, "start": "2026-10-20", "end": "2026-10-21",
+    "shift_type": "night", "reason": "sick"}]}; "end" defaults to "start" and a missing
+    shift_type covers every shift. Pass {"repair": false} to only record them.
+    """
+    
+    def post(self, request):
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return JsonResponse({'error': 'Invalid JSON body.'}, status=400)
+        if not isinstance(data, dict):
+            return JsonResponse({'error': 'The JSON body must be an object.'}, status=400)
+        entries = data.get('absences')
+        if not isinstance(entries, list) or not entries:
+            return JsonResponse({'error': '"absences" must be a non-empty list.'}, status=400)
+        
+        absences = []
+        try:
+            for entry in entries:
+                if not isinstance(entry, dict):
+                    raise ValueError('Each absence must be an object.')
+                start = parse_date(entry.get('start'), 'start')
+                end = parse_date(entry['end'], 'end') if entry.get('end') else start
+                if end < start:
+                    raise ValueError('end must not be before start.')
+                absences.append(WorkerAbsence(
+                    worker_id=entry.get('worker'), start_date=start, end_date=end,
+                    shift_type=parse_shift_type(entry.get('shift_type')),
+                    reason=str(entry.get('reason', ''))[:200],
+                ))
+        except (TypeError, ValueError) as e:
+            message = str(e) if isinstance(e, ValueError) else 'shift_type must be a string.'
+            return JsonResponse({'error': message}, status=400)
+        
+        error = unknown_workers_response([absence.worker_id for absence in absences])
+        if error:
+            return error
+        
+        WorkerAbsence.objects.bulk_create(absences)
+        if data.get('repair', True) is False:
+            return JsonResponse({'absences': len(absences), 'repairs': []})
+        
+        repairs, solve_info = repair_assignments(
+            min(absence.start_date for absence in absences),
+            max(absence.end_date for absence in absences)
+        )
+        logger.info("Repaired absences: %s", solve_info)
+        return JsonResponse({'absences': len(absences), 'repairs': repairs, **solve_info})
+
+class RepairView(View):
+    """
+    Repair every assignment between "start" and "end" (JSON body, default: today)
+    whose worker is absent or has an unavailable slot.
+    """
+    
+    def post(self, request):
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return JsonResponse({'error': 'Invalid JSON body.'}, status=400)
+        if not isinstance(data, dict):
+            return JsonResponse({'error': 'The JSON body must be an object.'}, status=400)
+        try:
+            start = parse_date(data['start'], 'start') if data.get('start') else datetime.now().date()
+            end = parse_date(data['end'], 'end') if data.get('end') else start
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        if end < start:
+            return JsonResponse({'error': 'end must not be before start.'}, status=400)
+        
+        repairs, solve_info = repair_assignments(start, end)
+        return JsonResponse({'repairs': repairs, **solve_info})
+
+class UnavailableSlotView(View):
+    """
+    List and record recurring unavailable slots.
+    
+    GET lists the slots, of one worker with ?worker=3. POST takes
+    {"slots": [{"worker": 3, "weekday": 6, "shift_type": "night"}]} with weekday 0 for
+    Monday and a missing shift_type for the whole day; slots already recorded are
+    skipped. Assignments in the next "repair_days" days (default 14, 0 to skip) are
+    then repaired.
+    """
+    
+    def get(self, request):
+        slots = UnavailableSlot.objects.order_by('worker_id', 'weekday', 'shift_type')
+        worker_id = request.GET.get('worker')
+        if worker_id:
+            if not worker_id.isdigit():
+                return JsonResponse({'error': 'worker must be an id.'}, status=400)
+            slots = slots.filter(worker_id=int(worker_id))
+        return JsonResponse({'slots': list(slots.values('id', 'worker_id', 'weekday', 'shift_type'))})
+    
+    def post(self, request):
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return JsonResponse({'error': 'Invalid JSON body.'}, status=400)
+        if not isinstance(data, dict):
+            return JsonResponse({'error': 'The JSON body must be an object.'}, status=400)
+        entries = data.get('slots')
+        if not isinstance(entries, list) or not entries:
+            return JsonResponse({'error': '"slots" must be a non-empty list.'}, status=400)
+        
+        weekdays = [value for value, label in UnavailableSlot.WEEKDAYS]
+        slots = []
+        try:
+            repair_days = int(data.get('repair_days', 14))
+            if not 0 <= repair_days <= MAX_HORIZON_DAYS:
+                raise ValueError(f'repair_days must be between 0 and {MAX_HORIZON_DAYS}.')
+            for entry in entries:
+                if not isinstance(entry, dict):
+                    raise ValueError('Each slot must be an object.')
+                if entry.get('weekday') not in weekdays or isinstance(entry.get('weekday'), bool):
+                    raise ValueError('weekday must be 0 (Monday) to 6 (Sunday).')
+                slots.append(UnavailableSlot(
+                    worker_id=entry.get('worker'), weekday=entry['weekday'],
+                    shift_type=parse_shift_type(entry.get('shift_type')),
+                ))
+        except (TypeError, ValueError) as e:
+            message = str(e) if isinstance(e, ValueError) else 'repair_days must be a number and shift_type a string.'
+            return JsonResponse({'error': message}, status=400)
+        
+        error = unknown_workers_response([slot.worker_id for slot in slots])
+        if error:
+            return error
+        
+        UnavailableSlot.objects.bulk_create(slots, ignore_conflicts=True)
+        if not repair_days:
+            return JsonResponse({'slots': len(slots), 'repairs': []})
+        
+        today = datetime.now().date()
+        repairs, solve_info = repair_assignments(today, today + timedelta(days=repair_days - 1))
+        logger.info("Repaired unavailable slots: %s", solve_info)
+        return JsonResponse({'slots': len(slots), 'repairs': repairs, **solve_info})
+
 class ProductionLineView(View):
     template_name = 'workforce/production_lines.html'
     
     def get(self, request):
-        production_lines = ProductionLine.objects.all().order_by('-priority')
+        production_lines = get_production_lines()
         form = ProductionLineForm()
         
         context = {
@@ -475,7 +852,7 @@ class ProductionLineView(View):
             form.save()
             return redirect('production_lines')
         
-        production_lines = ProductionLine.objects.all().order_by('-priority')
+        production_lines = get_production_lines()
         context = {
             'production_lines': production_lines,
             'form': form
@@ -502,10 +879,10 @@ class KnapsackView(TemplateView):
                 }, status=400)
             
             # Solve the knapsack problem
-            selected_items, total_value, total_weight = solve_knapsack(values, weights, capacity)
+            selected_items, total_value, total_weight, solve_info = solve_knapsack(values, weights, capacity)
             
             # Format the solution
-            solution = format_solution(selected_items, total_value, total_weight, values, weights)
+            solution = format_solution(selected_items, total_value, total_weight, values, weights, solve_info)
             
             return JsonResponse(solution)
             
@@ -513,3 +890,122 @@ class KnapsackView(TemplateView):
             return JsonResponse({
                 'error': f'Error solving knapsack problem: {str(e)}'
             }, status=500)
+
+class KnapsackStreamView(View):
+    """
+    Stream improving knapsack incumbents as Server-Sent Events.
+    Emits an 'incumbent' event per improvement and a final 'result' event.
+    
+    POST takes the JSON body of KnapsackView and needs a fetch-based stream reader.
+    GET takes ?values=3,4,5&weights=2,3,4&capacity=5 so that the browser's
+    EventSource can consume the stream directly.
+    """
+    
+    def get(self, request):
+        try:
+            values = [float(x) for x in request.GET.get('values', '').split(',') if x]
+            weights = [float(x) for x in request.GET.get('weights', '').split(',') if x]
+            capacity = float(request.GET.get('capacity', 0))
+        except ValueError:
+            values, weights, capacity = [], [], 0
+        return self.stream(values, weights, capacity)
+    
+    def post(self, request):
+        try:
+            data = json.loads(request.body)
+            values = [float(x) for x in data.get('values', [])]
+            weights = [float(x) for x in data.get('weights', [])]
+            capacity = float(data.get('capacity', 0))
+        except (ValueError, TypeError, AttributeError):
+            values, weights, capacity = [], [], 0
+        return self.stream(values, weights, capacity)
+    
+    def stream(self, values, weights, capacity):
+        if not values or not weights or capacity <= 0:
+            return JsonResponse({
+                'error': 'Invalid input data. Please provide valid values, weights, and capacity.'
+            }, status=400)
+        
+        def events():
+            solution = None
+            for selected_items, total_value, total_weight, solve_info in iter_knapsack_incumbents(values, weights, capacity):
+                solution = format_solution(selected_items, total_value, total_weight, values, weights, solve_info)
+                yield format_sse('incumbent', solution)
+            yield format_sse('result', solution)
+        
+        return event_stream_response(events())
+
+class LineBalancingStreamView(View):
+    """
+    Re-balance the workers of a shift across production lines, streaming improving
+    incumbents as Server-Sent Events. The final incumbent replaces the shift's line assignments.
+    
+    POST only, since it rewrites the assignments; EventSource cannot send POST, so
+    clients read the stream with fetch() and response.body.getReader().
+    """
+    
+    def post(self, request, shift_id):
+        try:
+            shift = Shift.objects.get(id=shift_id)
+        except Shift.DoesNotExist:
+            return JsonResponse({'error': 'Shift not found.'}, status=404)
+        
+        production_lines = list(ProductionLine.objects.all().order_by('-priority', 'id'))
+        assigned_workers = list(Worker.objects.filter(shiftassignment__shift=shift))
+        if not production_lines or not assigned_workers:
+            return JsonResponse({'error': 'Nothing to balance for this shift.'}, status=400)
+        
+        # A private problem from the shared compiled rows: the stream pauses between incumbents
+        model = get_compiled_model(production_lines).problem()
+        n_skilled = sum(1 for w in assigned_workers if w.skill_level == 'skilled')
+        model.set_pools(n_skilled, len(assigned_workers) - n_skilled)
+        budget = get_budget('line_balancing_stream')
+        
+        def events():
+            solve_info = None
+            for solve_info in iter_incumbents(
+                model.prob, budget,
+                bound=lambda: relaxation_bound(model.prob, budget['time_limit'])
+            ):
+                yield format_sse('incumbent', {
+                    'lines': line_counts(production_lines, model.read_counts()) if has_incumbent(solve_info) else [],
+                    **solve_info
+                })
+            
+            if solve_info and has_incumbent(solve_info):
+                shift_assignments = {
+                    sa.worker_id: sa
+                    for sa in ShiftAssignment.objects.filter(shift=shift)
+                }
+                assignment = assign_by_skill_counts(production_lines, model.read_counts(), assigned_workers)
+                with transaction.atomic():
+                    LineAssignment.objects.filter(shift_assignment__shift=shift).delete()
+                    LineAssignment.objects.bulk_create(build_line_assignments(shift_assignments, assignment))
+                invalidate_shift_rosters([shift.id])
+            yield format_sse('result', solve_info)
+        
+        return event_stream_response(events())
+
+def line_counts(production_lines, counts):
+    """
+    Workers per production line in a list of (skilled, semi-skilled) counts.
+    """
+    return [
+        {'line': line.name, 'skilled': skilled, 'semi_skilled': semi_skilled}
+        for line, (skilled, semi_skilled) in zip(production_lines, counts)
+    ]
+
+class SolverStatsView(View):
+    """
+    Report how often line balancing was settled by the heuristic engine
+    and how often it escalated to the MILP, for this worker process.
+    """
+    
+    def get(self, request):
+        return JsonResponse(engine_stats())
+
+def event_stream_response(events):
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response